@@ -0,0 +1,41 @@
+"""Artefatos pesados das abas (pivots e rankings), como funções puras de DataFrames.
+
+O app chama cada uma só quando a aba correspondente está aberta e cacheia o
+resultado por versão dos dados + estado dos filtros.
+"""
+import pandas as pd
+
+
+def fragilidade_adversarios(df_filtrado):
+    """Média de pontos cedida por cada adversário a cada posição (formato longo)."""
+    return (df_filtrado[df_filtrado['Adversario'] != 'N/A']
+            .groupby(['Adversario', 'posicao_nome'], observed=True)['atletas.pontos_num'].mean().reset_index())
+
+
+def raio_x(df_filtrado):
+    """Matriz adversário x posição, do adversário que menos cede para o que mais cede."""
+    h = fragilidade_adversarios(df_filtrado)
+    if h.empty: return pd.DataFrame()
+    p = h.pivot(index='Adversario', columns='posicao_nome', values='atletas.pontos_num').fillna(0)
+    return p.loc[p.sum(axis=1).sort_values().index]
+
+
+def media_por_clube(df_filtrado, col_clube):
+    g = df_filtrado.groupby(col_clube, observed=True)[['atletas.pontos_num', 'finalizacoes_total']].mean().reset_index()
+    return g.sort_values('atletas.pontos_num')
+
+
+def ofensivo_casa_fora(df_filtrado, col_clube):
+    return df_filtrado.groupby([col_clube, 'Mando_Padrao'], observed=True)['scouts_ofensivos_total'].mean().reset_index()
+
+
+def ranking_capitao(df_pool, df_jogos, fragilidade, rodada):
+    """Score = pontos no período + 2 x fragilidade do adversário da rodada contra a posição."""
+    jogos = df_jogos[df_jogos['rodada_id'] == rodada][['clube_id', 'Adversario']]
+    base = pd.merge(df_pool, jogos, left_on='atletas.clube_id', right_on='clube_id', how='inner')
+    if base.empty: return pd.DataFrame()
+    final = pd.merge(base, fragilidade, on=['Adversario', 'posicao_nome'], how='left')
+    final['Fragilidade'] = final['atletas.pontos_num'].fillna(0)
+    final['Score'] = final['pontuacao_total_periodo'] + (final['Fragilidade'] * 2)
+    cols = ['atletas.apelido', 'posicao_nome', 'Adversario', 'pontuacao_total_periodo', 'Fragilidade', 'Score']
+    return final[cols].sort_values('Score', ascending=False)
@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
-import glob
-import plotly.express as px
 import plotly.graph_objects as go
+from analises import media_por_clube, ofensivo_casa_fora, raio_x
+from armazenamento import versao_temporada
+from graficos import MODOS_DISPERSAO, barras_casa_fora, barras_media_clubes, dispersao_valorizacao, mapa_raio_x
+from otimizador import ESQUEMAS, MULT_CAPITAO, otimizar_escalacao, pontuacao_escalacao
+from perf import medidor_da_sessao
+from pipeline import TODOS_SCOUTS, preparar_temporada
+from projecao import TOP_K, projetar_capitaes
 
 # --- Configurações Iniciais ---
 st.set_page_config(page_title="Dashboard Cartola 2026", layout="wide", initial_sidebar_state="expanded")
 st.title("⚽ Dashboard Analítico - Cartola FC 2026")
 
+# Instrumentação opcional (?perf=1 ou CARTOLA_PERF=1); desligada, cada etapa é um `with` vazio
+perf = medidor_da_sessao(st.query_params)
+
 # --- Estilos CSS ---
 st.markdown("""
 <style>
@@ -25,84 +33,73 @@ def formatar_foto(url):
     return str(url).replace('FORMATO', '220x220')
 
 # --- Funções de Carregamento ---
-@st.cache_data
-def load_data():
-    # 1. Rodadas
-    rodada_files = sorted(glob.glob("rodada-*.csv"))
-    if not rodada_files: return pd.DataFrame(), pd.DataFrame()
-    dfs = []
-    for f in rodada_files:
-        try:
-            temp = pd.read_csv(f)
-            temp.columns = temp.columns.str.strip()
-            dfs.append(temp)
-        except: pass
-    df_main = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
-    if not df_main.empty: df_main = df_main.drop_duplicates(subset=['atletas.atleta_id', 'atletas.rodada_id'])
+# Só a Temporada final fica residente, uma cópia por processo compartilhada entre sessões (nada daqui
+# para baixo a altera). Os estágios do pipeline.py rodam dentro dela e seus frames intermediários são
+# descartados ao fim da montagem.
+@st.cache_resource(max_entries=1)
+def carregar_temporada_processada(versao):
+    return preparar_temporada(".", versao)
 
-    # 2. Confrontos
-    confronto_files = glob.glob("confrontos_*.csv")
-    df_jogos_list = []
-    for f in confronto_files:
-        try:
-            temp_df = pd.read_csv(f)
-            temp_df.columns = temp_df.columns.str.strip()
-            if 'Mando' in temp_df.columns:
-                temp_df['Mando_Padrao'] = temp_df['Mando'].apply(lambda x: 'CASA' if 'Casa' in str(x) and 'Fora' not in str(x) else 'FORA')
-            else: temp_df['Mando_Padrao'] = 'N/A'
-            df_jogos_list.append(temp_df)
-        except: pass
-    df_jogos = pd.concat(df_jogos_list, ignore_index=True) if df_jogos_list else pd.DataFrame()
-    if not df_jogos.empty: df_jogos = df_jogos.drop_duplicates(subset=['rodada_id', 'clube_id'])
-    
-    return df_main, df_jogos
+# Artefatos das abas: calculados só quando a aba abre, cacheados por versão + filtros
+@st.cache_data(max_entries=64)
+def calcular_raio_x(versao, filtros):
+    t = carregar_temporada_processada(versao)
+    return raio_x(t.df[t.mascaras(filtros)[1]])
 
-df, df_jogos = load_data()
+@st.cache_data(max_entries=64)
+def calcular_media_clubes(versao, filtros):
+    t = carregar_temporada_processada(versao)
+    return media_por_clube(t.df[t.mascaras(filtros)[1]], t.col_clube)
 
-# --- Processamento ---
-if df.empty:
-    st.error("⚠️ Nenhum dado encontrado.")
-else:
-    # Identificação Dinâmica da Coluna de Clube (Correção do KeyError)
-    possiveis_nomes_clube = ['atletas.clube.id.full.name', 'Clube', 'clube_nome', 'atletas.clube_id_full_name', 'club_name']
-    col_clube = next((c for c in possiveis_nomes_clube if c in df.columns), None)
-    
-    if not col_clube:
-        # Se não achar, cria uma genérica baseada no ID
-        df['Nome_Clube_Gen'] = "Clube " + df['atletas.clube_id'].astype(str)
-        col_clube = 'Nome_Clube_Gen'
+@st.cache_data(max_entries=64)
+def calcular_casa_fora(versao, filtros):
+    t = carregar_temporada_processada(versao)
+    return ofensivo_casa_fora(t.df[t.mascaras(filtros)[1]], t.col_clube)
 
-    # Tipagem
-    df['atletas.rodada_id'] = pd.to_numeric(df['atletas.rodada_id'], errors='coerce').fillna(0).astype(int)
-    df['atletas.clube_id'] = pd.to_numeric(df['atletas.clube_id'], errors='coerce').fillna(0).astype(int)
-    
-    if not df_jogos.empty:
-        df_jogos['rodada_id'] = pd.to_numeric(df_jogos['rodada_id'], errors='coerce').fillna(0).astype(int)
-        df_jogos['clube_id'] = pd.to_numeric(df_jogos['clube_id'], errors='coerce').fillna(0).astype(int)
-        cols_jogo = ['rodada_id', 'clube_id']
-        for c in ['Mando_Padrao', 'Adversario', 'Estadio', 'Data', 'Hora']:
-            if c in df_jogos.columns: cols_jogo.append(c)
-        df = pd.merge(df, df_jogos[cols_jogo], left_on=['atletas.rodada_id', 'atletas.clube_id'], right_on=['rodada_id', 'clube_id'], how='left')
-    
-    for c in ['Mando_Padrao', 'Adversario']:
-        if c not in df.columns: df[c] = 'N/A'
-        df[c] = df[c].fillna('N/A')
+@st.cache_data(max_entries=64)
+def calcular_projecao_capitao(versao, filtros, rodada):
+    # Só rodadas anteriores à projetada: a janela do slider é cortada em `rodada - 1`. Candidatos seguem
+    # os filtros; o histórico de adversário/mando usa todos os clubes da janela
+    t = carregar_temporada_processada(versao)
+    janela = (filtros[0][0], min(filtros[0][1], rodada - 1))
+    if janela[0] > janela[1]: return pd.DataFrame()
+    pool = t.agrupar(janela, t.mascaras((janela,) + tuple(filtros[1:]))[0])
+    if pool.empty: return pd.DataFrame()
+    hist = t.df[t.mascaras((janela, (0, float('inf')), (), (), ()))[0]]
+    return projetar_capitaes(pool, hist, t.df_jogos, rodada)
 
-    df = df.drop_duplicates(subset=['atletas.atleta_id', 'atletas.rodada_id'])
-    pos_map = {1: 'Goleiro', 2: 'Lateral', 3: 'Zagueiro', 4: 'Meia', 5: 'Atacante', 6: 'Técnico'}
-    df['posicao_nome'] = df['atletas.posicao_id'].map(pos_map)
+# Figuras prontas por versão + filtros. cache_resource devolve o mesmo objeto (sem pickle de uma figura
+# inteira a cada rerun); st.plotly_chart só lê a figura, então compartilhar entre sessões é seguro.
+@st.cache_resource(max_entries=64)
+def figura_raio_x(versao, filtros):
+    p = calcular_raio_x(versao, filtros)
+    return None if p.empty else mapa_raio_x(p)
 
-    todos_scouts = ['G', 'A', 'FT', 'FD', 'FF', 'FS', 'PS', 'I', 'PP', 'DS', 'SG', 'DE', 'DP', 'GS', 'FC', 'PC', 'CA', 'CV', 'GC']
-    for col in todos_scouts:
-        if col not in df.columns: df[col] = 0
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+@st.cache_resource(max_entries=64)
+def figura_media_clubes(versao, filtros):
+    return barras_media_clubes(calcular_media_clubes(versao, filtros), carregar_temporada_processada(versao).col_clube)
 
-    # Auxiliares
-    df['tamanho_visual'] = df['atletas.pontos_num'].apply(lambda x: max(1.0, x))
-    df['scouts_ofensivos_total'] = df['G'] + df['A'] + df['FD'] + df['FF'] + df['FT'] + df['FS']
-    df['scouts_defensivos_total'] = df['DS'] + df['DE'] + df['SG']
-    df['finalizacoes_total'] = df['FD'] + df['FF'] + df['FT']
+@st.cache_resource(max_entries=64)
+def figura_casa_fora(versao, filtros):
+    return barras_casa_fora(calcular_casa_fora(versao, filtros), carregar_temporada_processada(versao).col_clube)
 
+@st.cache_resource(max_entries=64)
+def figura_valorizacao(versao, filtros, modo):
+    t = carregar_temporada_processada(versao)
+    return dispersao_valorizacao(t.df[t.mascaras(filtros)[1]], modo)
+
+with perf.etapa("versao"):
+    versao_dados = versao_temporada()
+with perf.etapa("carga") as e:
+    temporada = carregar_temporada_processada(versao_dados)
+    e.linhas = len(temporada.df)
+df, df_jogos, dim_atletas, col_clube = temporada.df, temporada.df_jogos, temporada.dim_atletas, temporada.col_clube
+todos_scouts = TODOS_SCOUTS
+
+# --- Processamento ---
+if temporada.vazia:
+    st.error("⚠️ Nenhum dado encontrado.")
+else:
     # ==========================================
     # --- SIDEBAR ---
     # ==========================================
@@ -120,38 +117,17 @@ else:
     sel_mando = st.sidebar.multiselect("Mando", ['CASA', 'FORA'], default=['CASA', 'FORA'])
     
     # --- FILTRAGEM ---
-    df_filtrado_base = df[(df['atletas.rodada_id'] >= sel_rodada_range[0]) & (df['atletas.rodada_id'] <= sel_rodada_range[1])]
-    if sel_clube: df_filtrado_base = df_filtrado_base[df_filtrado_base[col_clube].isin(sel_clube)]
-    if sel_posicao: df_filtrado_base = df_filtrado_base[df_filtrado_base['posicao_nome'].isin(sel_posicao)]
-    if sel_mando: df_filtrado_base = df_filtrado_base[df_filtrado_base['Mando_Padrao'].isin(sel_mando)]
-    
-    df_filtrado_completo = df_filtrado_base[(df_filtrado_base['atletas.preco_num'] >= sel_preco_range[0]) & (df_filtrado_base['atletas.preco_num'] <= sel_preco_range[1])]
+    filtros = (tuple(sel_rodada_range), tuple(sel_preco_range), tuple(sel_clube), tuple(sel_posicao), tuple(sel_mando))
+    with perf.etapa("filtros") as e:
+        mascara_base, mascara_completo = temporada.mascaras(filtros)
+        e.linhas = int(mascara_base.sum())
 
     # --- AGRUPAMENTO ---
-    def agrupar_dados(dataframe_input):
-        if dataframe_input.empty: return pd.DataFrame()
-        df_sorted = dataframe_input.sort_values('atletas.rodada_id', ascending=True)
-        agg_dict = {
-            'atletas.pontos_num': 'sum',
-            'atletas.preco_num': 'last', 'atletas.apelido': 'last',
-            col_clube: 'last', 'atletas.clube_id': 'last',
-            'posicao_nome': 'last', 'atletas.foto': 'last',
-            'finalizacoes_total': 'last', 'atletas.jogos_num': 'last'
-        }
-        for s in todos_scouts: agg_dict[s] = 'last'
-        df_grouped = df_sorted.groupby('atletas.atleta_id').agg(agg_dict).reset_index()
-        df_grouped.rename(columns={'atletas.pontos_num': 'pontuacao_total_periodo'}, inplace=True)
-        
-        # CÁLCULO PONTUAÇÃO BÁSICA (RESTAURADO)
-        df_grouped['pontuacao_basica_atual'] = (
-            (df_grouped['DS'] * 1.2) + (df_grouped['DE'] * 1.0) + (df_grouped['SG'] * 5.0) + 
-            (df_grouped['FS'] * 0.5) + (df_grouped['FD'] * 1.2) + (df_grouped['FT'] * 3.0) + 
-            (df_grouped['FF'] * 0.8) + (df_grouped['PS'] * 1.0) + (df_grouped['DP'] * 7.0)
-        )
-        return df_grouped
-
-    df_agrupado_geral = agrupar_dados(df_filtrado_completo)
-    df_pool_total = agrupar_dados(df_filtrado_base)
+    # Soma dos pontos na janela + último preço/clube/posição/scouts, direto do índice atleta x rodada
+    with perf.etapa("agrupamento") as e:
+        df_agrupado_geral = temporada.agrupar(sel_rodada_range, mascara_completo)
+        df_pool_total = temporada.agrupar(sel_rodada_range, mascara_base)
+        e.linhas = len(df_pool_total)
 
     # ==========================================
     # --- DASHBOARD ---
@@ -159,59 +135,27 @@ else:
     if df_agrupado_geral.empty and df_pool_total.empty:
         st.warning("⚠️ Nenhum jogador encontrado.")
     else:
-        tab1, tab2, tab3, tab4 = st.tabs(["📅 Central de Jogos", "🤖 Inteligência", "📊 Tática", "📈 Mercado"])
+        # Abas com estado: só o conteúdo da aba aberta roda a cada interação
+        tab1, tab2, tab3, tab4 = st.tabs(["📅 Central de Jogos", "🤖 Inteligência", "📊 Tática", "📈 Mercado"], key="aba", on_change="rerun")
 
         # ---------------------------------------------------------
         # ABA 1: CENTRAL DE JOGOS
         # ---------------------------------------------------------
-        with tab1:
-            if not df_jogos.empty:
-                col_sel, col_kpi = st.columns([1, 3])
-                with col_sel:
-                    rodadas_disp = sorted(df_jogos['rodada_id'].unique())
-                    rodada_selecionada = st.selectbox("Selecione a Rodada:", rodadas_disp)
-                
-                jogos_r = df_jogos[df_jogos['rodada_id'] == rodada_selecionada]
-                stats_clubes = df.groupby([col_clube, 'Mando_Padrao'])['atletas.pontos_num'].mean().reset_index()
-                
-                jogos_unicos = jogos_r[jogos_r['Mando_Padrao'] == 'CASA'].copy()
-                
-                if not jogos_unicos.empty:
-                    tabela = []
-                    # Mapeamento ID -> Nome seguro
-                    mapa_nomes = df[['atletas.clube_id', col_clube]].drop_duplicates().set_index('atletas.clube_id')[col_clube].to_dict()
-
-                    for _, jogo in jogos_unicos.iterrows():
-                        mandante = mapa_nomes.get(jogo['clube_id'], f"ID {jogo['clube_id']}")
-                        visitante = jogo['Adversario']
-                        
-                        m_stat = stats_clubes[(stats_clubes[col_clube] == mandante) & (stats_clubes['Mando_Padrao'] == 'CASA')]['atletas.pontos_num'].mean()
-                        v_stat = stats_clubes[(stats_clubes[col_clube].astype(str).str.contains(visitante, case=False, na=False)) & (stats_clubes['Mando_Padrao'] == 'FORA')]['atletas.pontos_num'].mean()
-                        
-                        m_val = m_stat if pd.notna(m_stat) else 0
-                        v_val = v_stat if pd.notna(v_stat) else 0
-                        
-                        delta = m_val - v_val
-                        fav_bar = "⚪ Equilibrado"
-                        if delta > 10: fav_bar = "🟢 Mandante Forte"
-                        elif delta < -10: fav_bar = "🔴 Visitante Forte"
-                        elif delta > 0: fav_bar = "🟢 Leve Mandante"
-                        elif delta < 0: fav_bar = "🔴 Leve Visitante"
-
-                        tabela.append({
-                            "Data/Hora": f"{jogo.get('Data','')} {jogo.get('Hora','')}",
-                            "Mandante": mandante,
-                            "Força Casa": m_val,
-                            "Visitante": visitante,
-                            "Força Fora": v_val,
-                            "Favoritismo": fav_bar,
-                            "Local": jogo.get('Estadio', '')
-                        })
+        if tab1.open:
+            with tab1:
+                if not df_jogos.empty:
+                    col_sel, col_kpi = st.columns([1, 3])
+                    with col_sel:
+                        rodadas_disp = sorted(df_jogos['rodada_id'].unique())
+                        rodada_selecionada = st.selectbox("Selecione a Rodada:", rodadas_disp)
                     
-                    df_view_jogos = pd.DataFrame(tabela)
+                    with perf.etapa("jogos") as e:
+                        confrontos = temporada.confrontos
+                        df_view_jogos = confrontos[confrontos['rodada_id'] == rodada_selecionada].drop(columns='rodada_id')
+                        e.linhas = len(df_view_jogos)
                     
-                    # KPIs
                     if not df_view_jogos.empty:
+                        # KPIs
                         best_home = df_view_jogos.loc[df_view_jogos['Força Casa'].idxmax()]
                         worst_away = df_view_jogos.loc[df_view_jogos['Força Fora'].idxmin()]
                         
@@ -219,128 +163,155 @@ else:
                         k1.metric("🏰 Melhor Mandante", best_home['Mandante'], f"{best_home['Força Casa']:.1f} pts")
                         k2.metric("🚌 Visitante + Fraco", worst_away['Visitante'], f"{worst_away['Força Fora']:.1f} pts")
                         k3.metric("🔥 Jogo + Promissor", f"{best_home['Mandante']} x {best_home['Visitante']}")
-                    
-                    st.dataframe(
-                        df_view_jogos,
-                        column_config={
-                            "Força Casa": st.column_config.ProgressColumn("Média Casa", format="%.1f", min_value=0, max_value=80),
-                            "Força Fora": st.column_config.ProgressColumn("Média Fora", format="%.1f", min_value=0, max_value=80),
-                        },
-                        use_container_width=True, hide_index=True
-                    )
-            else: st.warning("Confrontos não carregados.")
+                        
+                        st.dataframe(
+                            df_view_jogos,
+                            column_config={
+                                "Força Casa": st.column_config.ProgressColumn("Média Casa", format="%.1f", min_value=0, max_value=80),
+                                "Força Fora": st.column_config.ProgressColumn("Média Fora", format="%.1f", min_value=0, max_value=80),
+                            },
+                            use_container_width=True, hide_index=True
+                        )
+                else: st.warning("Confrontos não carregados.")
 
         # ---------------------------------------------------------
         # ABA 2: INTELIGÊNCIA
         # ---------------------------------------------------------
-        with tab2:
-            st1, st2, st3 = st.tabs(["🤖 Robô", "⚔️ Comparador", "© Capitão"])
-            
-            with st1:
-                c1, c2 = st.columns(2)
-                orc = c1.number_input("Orçamento", value=100.0)
-                esq = c2.selectbox("Esquema", ["4-3-3","3-4-3","3-5-2","4-4-2","5-3-2"])
-                if st.button("Escalar"):
-                    esqs = {"4-3-3": {'Goleiro':1,'Lateral':2,'Zagueiro':2,'Meia':3,'Atacante':3,'Técnico':0}, "3-4-3": {'Goleiro':1,'Lateral':0,'Zagueiro':3,'Meia':4,'Atacante':3,'Técnico':0}, "3-5-2": {'Goleiro':1,'Lateral':0,'Zagueiro':3,'Meia':5,'Atacante':2,'Técnico':0}, "4-4-2": {'Goleiro':1,'Lateral':2,'Zagueiro':2,'Meia':4,'Atacante':2,'Técnico':0}, "5-3-2": {'Goleiro':1,'Lateral':2,'Zagueiro':3,'Meia':3,'Atacante':2,'Técnico':0}}
-                    pool = df_pool_total.sort_values('pontuacao_total_periodo', ascending=False)
-                    time, custo = [], 0
-                    for p, q in esqs[esq].items(): 
-                        if q>0: time.append(pool[pool['posicao_nome']==p].head(q))
-                    if time:
-                        df_t = pd.concat(time)
-                        custo = df_t['atletas.preco_num'].sum()
-                        loop = 0
-                        while custo > orc and loop < 100:
-                            mt, mr = None, float('inf')
-                            for i, s in df_t.iterrows():
-                                cs = pool[(pool['posicao_nome']==s['posicao_nome'])&(pool['atletas.preco_num']<s['atletas.preco_num'])&(~pool['atletas.atleta_id'].isin(df_t['atletas.atleta_id']))]
-                                if not cs.empty:
-                                    e = cs.iloc[0]
-                                    eco = s['atletas.preco_num'] - e['atletas.preco_num']
-                                    if eco > 0:
-                                        r = (s['pontuacao_total_periodo'] - e['pontuacao_total_periodo']) / eco
-                                        if r < mr: mr, mt = r, (i, e)
-                            if mt:
-                                df_t = df_t.drop(mt[0])
-                                df_t = pd.concat([df_t, mt[1].to_frame().T])
+        if tab2.open:
+            with tab2:
+                st1, st2, st3 = st.tabs(["🤖 Robô", "⚔️ Comparador", "© Capitão"], key="aba_inteligencia", on_change="rerun")
+                
+                if st1.open:
+                    with st1:
+                        c1, c2, c3, c4 = st.columns(4)
+                        orc = c1.number_input("Orçamento", min_value=0.0, max_value=500.0, value=100.0)
+                        esq = c2.selectbox("Esquema", list(ESQUEMAS))
+                        com_tecnico = c3.checkbox("Com Técnico")
+                        com_capitao = c4.checkbox(f"Capitão ({MULT_CAPITAO:g}x)")
+                        if st.button("Escalar"):
+                            mult = MULT_CAPITAO if com_capitao else None
+                            with perf.etapa("escalar", len(df_pool_total)):
+                                df_t = otimizar_escalacao(df_pool_total, esq, orc, incluir_tecnico=com_tecnico, capitao_mult=mult)
+                            if df_t.empty: st.warning("Nenhuma escalação cabe no orçamento com esse esquema.")
+                            else:
                                 custo = df_t['atletas.preco_num'].sum()
-                            else: break
-                            loop += 1
-                        st.success(f"Time Escalado! C$: {custo:.2f}")
-                        st.dataframe(df_t[['posicao_nome','atletas.apelido','atletas.preco_num','pontuacao_total_periodo']].sort_values('posicao_nome'), use_container_width=True)
-            
-            with st2:
-                c1, c2 = st.columns(2)
-                b1, b2 = c1.text_input("Busca Jogador 1", "").strip().lower(), c2.text_input("Busca Jogador 2", "").strip().lower()
-                ns = sorted(df_pool_total['atletas.apelido'].unique())
-                l1, l2 = [n for n in ns if b1 in n.lower()] if b1 else ns, [n for n in ns if b2 in n.lower()] if b2 else ns
-                p1, p2 = c1.selectbox("J1", l1, key='s1'), c2.selectbox("J2", l2, key='s2')
-                if p1 and p2:
-                    d1, d2 = df_pool_total[df_pool_total['atletas.apelido']==p1].iloc[0], df_pool_total[df_pool_total['atletas.apelido']==p2].iloc[0]
-                    fig = go.Figure()
-                    cats = ['Pontos','Gols','Assist','Fin','Desarmes']
-                    v1 = [d1['pontuacao_total_periodo'],d1['G'],d1['A'],d1['finalizacoes_total'],d1['DS']]
-                    v2 = [d2['pontuacao_total_periodo'],d2['G'],d2['A'],d2['finalizacoes_total'],d2['DS']]
-                    fig.add_trace(go.Scatterpolar(r=v1, theta=cats, fill='toself', name=p1)); fig.add_trace(go.Scatterpolar(r=v2, theta=cats, fill='toself', name=p2))
-                    st.plotly_chart(fig, use_container_width=True)
+                                st.success(f"Time Escalado! C$: {custo:.2f} | Pontos: {pontuacao_escalacao(df_t, mult):.1f}")
+                                st.dataframe(df_t[['posicao_nome','atletas.apelido','atletas.preco_num','pontuacao_total_periodo','capitao']].sort_values('posicao_nome'), use_container_width=True)
+                
+                if st2.open:
+                    with st2:
+                        # Busca indexada (busca.py) por apelido/nome/slug; a seleção guarda atleta_id, não apelido
+                        pool_ids = df_pool_total.set_index('atletas.atleta_id')
+                        b = st.text_input("Buscar jogadores", "")
+                        padrao = pool_ids['pontuacao_total_periodo'].nlargest(2).index.tolist()
+                        selecionados = [i for i in st.session_state.get('comparador_ids', padrao) if i in pool_ids.index]
+                        with perf.etapa("comparador.busca") as e:
+                            achados = temporada.busca.buscar(b, limite=50, candidatos=pool_ids.index) if b.strip() else \
+                                pool_ids['pontuacao_total_periodo'].nlargest(50).index
+                            e.linhas = len(achados)
+                        opcoes = selecionados + [int(i) for i in achados if i not in selecionados]
+                        rotulo = lambda i: f"{pool_ids.at[i, 'atletas.apelido']} ({pool_ids.at[i, col_clube]}, {pool_ids.at[i, 'posicao_nome']})"
+                        ids = st.multiselect("Jogadores", opcoes, default=selecionados, format_func=rotulo, max_selections=6, key='comparador_ids')
+                        if ids:
+                            fig = go.Figure()
+                            cats = ['Pontos','Gols','Assist','Fin','Desarmes']
+                            for i in ids:
+                                d = pool_ids.loc[i]
+                                fig.add_trace(go.Scatterpolar(r=[d['pontuacao_total_periodo'],d['G'],d['A'],d['finalizacoes_total'],d['DS']],
+                                                              theta=cats, fill='toself', name=rotulo(i)))
+                            with perf.etapa("comparador.grafico"):
+                                st.plotly_chart(fig, use_container_width=True)
 
-            with st3:
-                if not df_jogos.empty:
-                    rod = st.selectbox("Rodada Capitão:", sorted(df_jogos['rodada_id'].unique()))
-                    jogos = df_jogos[df_jogos['rodada_id']==rod][['clube_id','Adversario']]
-                    if not df_pool_total.empty:
-                        base = pd.merge(df_pool_total, jogos, left_on='atletas.clube_id', right_on='clube_id', how='inner')
-                        if not base.empty:
-                            heat = df_filtrado_completo[df_filtrado_completo['Adversario']!='N/A'].groupby(['Adversario','posicao_nome'])['atletas.pontos_num'].mean().reset_index()
-                            final = pd.merge(base, heat, on=['Adversario','posicao_nome'], how='left')
-                            final['Fragilidade'] = final['atletas.pontos_num'].fillna(0)
-                            final['Score'] = final['pontuacao_total_periodo'] + (final['Fragilidade']*2)
-                            st.dataframe(final[['atletas.apelido','posicao_nome','Adversario','pontuacao_total_periodo','Fragilidade','Score']].sort_values('Score', ascending=False), use_container_width=True)
+                if st3.open:
+                    with st3:
+                        if not df_jogos.empty:
+                            # Abre na próxima rodada ainda sem pontuação (ou na última): a primeira nunca tem histórico
+                            rodadas_cap = sorted(df_jogos['rodada_id'].unique())
+                            ultima_pontuada = int(df['atletas.rodada_id'].max())
+                            padrao = next((i for i, r in enumerate(rodadas_cap) if r > ultima_pontuada), len(rodadas_cap) - 1)
+                            rod = st.selectbox("Rodada Capitão:", rodadas_cap, index=padrao)
+                            with perf.etapa("capitao") as e:
+                                final = calcular_projecao_capitao(versao_dados, filtros, rod)
+                                e.linhas = len(final)
+                            st.caption(f"Projeção Monte Carlo: média do atleta encolhida para a da posição + ajuste do adversário "
+                                       f"e do mando. P(Top {TOP_K}) = chance de estar entre os {TOP_K} maiores da rodada.")
+                            if final.empty:
+                                st.info(f"Sem rodadas anteriores à rodada {rod} no período e filtros selecionados para projetar.")
+                            else:
+                                st.dataframe(final, use_container_width=True, hide_index=True,
+                                             column_config={c: st.column_config.ProgressColumn(c, format="percent", min_value=0, max_value=1)
+                                                            for c in ('P(Top 1)', f'P(Top {TOP_K})')})
 
         # ---------------------------------------------------------
         # ABA 3: TÁTICA
         # ---------------------------------------------------------
-        with tab3:
-            st1, st2, st3 = st.tabs(["🔥 Raio-X", "🛡️ Times", "🏠 Casa/Fora"])
-            with st1:
-                if 'Adversario' in df_filtrado_completo.columns:
-                    h = df_filtrado_completo[df_filtrado_completo['Adversario']!='N/A'].groupby(['Adversario','posicao_nome'])['atletas.pontos_num'].mean().reset_index()
-                    if not h.empty:
-                        p = h.pivot(index='Adversario', columns='posicao_nome', values='atletas.pontos_num').fillna(0)
-                        p['T'] = p.sum(axis=1); p = p.sort_values('T').drop(columns='T')
-                        st.plotly_chart(px.imshow(p, text_auto=".1f", color_continuous_scale="Reds"), use_container_width=True)
-            with st2:
-                g = df_filtrado_completo.groupby(col_clube)[['atletas.pontos_num','finalizacoes_total']].mean().reset_index()
-                st.plotly_chart(px.bar(g.sort_values('atletas.pontos_num'), x='atletas.pontos_num', y=col_clube, orientation='h', title="Média Pts"), use_container_width=True)
-            with st3:
-                if 'Mando_Padrao' in df_filtrado_completo.columns:
-                    g = df_filtrado_completo.groupby([col_clube,'Mando_Padrao'])['scouts_ofensivos_total'].mean().reset_index()
-                    st.plotly_chart(px.bar(g, x=col_clube, y='scouts_ofensivos_total', color='Mando_Padrao', barmode='group'), use_container_width=True)
+        if tab3.open:
+            with tab3:
+                st1, st2, st3 = st.tabs(["🔥 Raio-X", "🛡️ Times", "🏠 Casa/Fora"], key="aba_tatica", on_change="rerun")
+                if st1.open:
+                    with st1:
+                        with perf.etapa("raio_x"):
+                            fig = figura_raio_x(versao_dados, filtros)
+                        if fig is not None:
+                            with perf.etapa("raio_x.grafico"):
+                                st.plotly_chart(fig, use_container_width=True)
+                if st2.open:
+                    with st2:
+                        with perf.etapa("times"):
+                            fig = figura_media_clubes(versao_dados, filtros)
+                        with perf.etapa("times.grafico"):
+                            st.plotly_chart(fig, use_container_width=True)
+                if st3.open:
+                    with st3:
+                        with perf.etapa("casa_fora"):
+                            fig = figura_casa_fora(versao_dados, filtros)
+                        with perf.etapa("casa_fora.grafico"):
+                            st.plotly_chart(fig, use_container_width=True)
 
         # ---------------------------------------------------------
         # ABA 4: MERCADO & DADOS
         # ---------------------------------------------------------
-        with tab4:
-            st1, st2, st3 = st.tabs(["📋 Tabela", "💎 Valorização", "🏆 Destaques"])
-            with st1:
-                b = st.text_input("Buscar Tabela", "").strip().lower()
-                show = df_agrupado_geral
-                if b: show = show[show['atletas.apelido'].str.lower().str.contains(b)]
-                # COLUNAS INCLUINDO PONTUAÇÃO BÁSICA
-                cols = ['atletas.apelido', col_clube, 'posicao_nome', 'atletas.preco_num', 'pontuacao_total_periodo', 'pontuacao_basica_atual'] + todos_scouts
-                st.dataframe(show[cols].sort_values('pontuacao_total_periodo', ascending=False), use_container_width=True, hide_index=True)
-            with st2:
-                st.plotly_chart(px.scatter(df_filtrado_completo, x='atletas.preco_num', y='atletas.pontos_num', color='posicao_nome', hover_name='atletas.apelido'), use_container_width=True)
-            with st3:
-                def rd(l, c, ct):
-                    if df_agrupado_geral.empty or c not in df_agrupado_geral or df_agrupado_geral[c].sum()==0: return
-                    r = df_agrupado_geral.loc[df_agrupado_geral[c].idxmax()]
-                    with ct:
-                        st.markdown(f"**{l}**")
-                        c1,c2 = st.columns([1,2])
-                        c1.image(formatar_foto(r.get('atletas.foto','')), width=60)
-                        c2.caption(r['atletas.apelido'])
-                        st.metric("Total", int(r[c]))
-                        st.divider()
-                c1,c2,c3,c4 = st.columns(4)
-                rd("Gols",'G',c1); rd("Assist",'A',c2); rd("Desarmes",'DS',c3); rd("SG",'SG',c4)
+        if tab4.open:
+            with tab4:
+                st1, st2, st3 = st.tabs(["📋 Tabela", "💎 Valorização", "🏆 Destaques"], key="aba_mercado", on_change="rerun")
+                if st1.open:
+                    with st1:
+                        b = st.text_input("Buscar Tabela", "").strip()
+                        with perf.etapa("tabela") as e:
+                            show = df_agrupado_geral
+                            if b: show = show[show['atletas.atleta_id'].isin(temporada.busca.buscar(b, limite=None, candidatos=show['atletas.atleta_id']))]
+                            # COLUNAS INCLUINDO PONTUAÇÃO BÁSICA
+                            cols = ['atletas.apelido', col_clube, 'posicao_nome', 'atletas.preco_num', 'pontuacao_total_periodo', 'pontuacao_basica_atual'] + todos_scouts
+                            st.dataframe(show[cols].sort_values('pontuacao_total_periodo', ascending=False), use_container_width=True, hide_index=True)
+                            e.linhas = len(show)
+                if st2.open:
+                    with st2:
+                        modo = st.radio("Detalhe", MODOS_DISPERSAO, horizontal=True, key="modo_valorizacao")
+                        with perf.etapa("valorizacao") as e:
+                            fig, modo_efetivo, n_pontos = figura_valorizacao(versao_dados, filtros, modo)
+                            e.linhas = n_pontos
+                        st.caption(f"{modo_efetivo}: {n_pontos} {'células' if modo_efetivo == 'Densidade' else 'pontos'} no gráfico")
+                        with perf.etapa("valorizacao.grafico", n_pontos):
+                            st.plotly_chart(fig, use_container_width=True)
+                if st3.open:
+                    with st3:
+                        def rd(l, c, ct):
+                            if df_agrupado_geral.empty or c not in df_agrupado_geral or df_agrupado_geral[c].sum()==0: return
+                            r = df_agrupado_geral.loc[df_agrupado_geral[c].idxmax()]
+                            with ct:
+                                st.markdown(f"**{l}**")
+                                c1,c2 = st.columns([1,2])
+                                c1.image(formatar_foto(dim_atletas['atletas.foto'].get(r['atletas.atleta_id'])), width=60)
+                                c2.caption(r['atletas.apelido'])
+                                st.metric("Total", int(r[c]))
+                                st.divider()
+                        with perf.etapa("destaques"):
+                            c1,c2,c3,c4 = st.columns(4)
+                            rd("Gols",'G',c1); rd("Assist",'A',c2); rd("Desarmes",'DS',c3); rd("SG",'SG',c4)
+
+# --- Painel de performance (oculto, só com a instrumentação ligada) ---
+if perf.ativo:
+    with st.sidebar.expander("⏱️ Perf", expanded=True):
+        st.caption(f"Rerun: {perf.total_ms():.0f} ms · {len(perf.registros)} etapas")
+        st.dataframe(pd.DataFrame(perf.registros).round(2), hide_index=True, use_container_width=True)
+    perf.salvar(versao=versao_dados)
@@ -0,0 +1,288 @@
+"""Armazenamento colunar da temporada com ingestão incremental dos CSVs.
+
+Os arquivos `rodada-*.csv` e `confrontos_*.csv` são lidos uma única vez, com o
+schema unificado, e gravados em Feather (Arrow IPC sem compressão) dentro de
+`DIR_STORE`. Um manifesto guarda caminho, mtime, tamanho e hash de cada CSV:
+em execuções seguintes só os arquivos novos/alterados são parseados, e o
+carregamento a frio vira uma leitura memory-mapped por tabela.
+
+`sincronizar` é serializado entre threads (lock do módulo) e entre processos
+(lock de arquivo em `DIR_STORE`), e cada tabela/manifesto é gravado num
+temporário único e trocado com `os.replace`: quem já tem o Feather antigo
+mapeado continua lendo o arquivo antigo.
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+DIR_STORE = ".cartola_store"
+VERSAO_SCHEMA = 2
+COL_ARQUIVO = "_arquivo"
+
+# Ordem canônica das colunas (cada CSV de rodada vem numa ordem diferente)
+COLS_RODADA_INT = ['atletas.atleta_id', 'atletas.rodada_id', 'atletas.clube_id', 'atletas.posicao_id',
+                   'atletas.status_id', 'atletas.jogos_num']
+COLS_RODADA_NUM = ['atletas.pontos_num', 'atletas.preco_num', 'atletas.media_num', 'atletas.variacao_num']
+COLS_RODADA_STR = ['atletas.apelido', 'atletas.apelido_abreviado', 'atletas.nome', 'atletas.slug',
+                   'atletas.foto', 'atletas.clube.id.full.name']
+COLS_JOGO_INT = ['rodada_id', 'clube_id']
+# Nomes que a coluna de clube já teve nos CSVs (texto, nunca convertida para número)
+POSSIVEIS_NOMES_CLUBE = ['atletas.clube.id.full.name', 'Clube', 'clube_nome', 'atletas.clube_id_full_name', 'club_name']
+
+_LOCK_SYNC = threading.Lock()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _trava_arquivo(caminho):
+    """Lock exclusivo entre processos sobre `caminho` (criado se não existe)."""
+    with open(caminho, 'a+b') as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _gravar_atomico(caminho, escrever):
+    """Chama `escrever(tmp)` num temporário único ao lado de `caminho` e troca com `os.replace`."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), prefix=os.path.basename(caminho) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        escrever(tmp)
+        os.replace(tmp, caminho)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha1()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _normalizar_colunas(df):
+    df.columns = df.columns.str.strip()
+    # Coluna de índice salva pelo pandas ao exportar o CSV
+    return df.drop(columns=[c for c in df.columns if c == '' or c.startswith('Unnamed:')])
+
+
+def _para_int(serie):
+    return pd.to_numeric(serie, errors='coerce').fillna(0).astype('int64')
+
+
+def _para_str(serie):
+    return serie.astype('string').astype(object).where(serie.notna(), None)
+
+
+def _numerica(serie):
+    """float64 se todo valor não nulo é número; None se a coluna tem texto."""
+    num = pd.to_numeric(serie, errors='coerce')
+    if (num.isna() & serie.notna()).any(): return None
+    return num.astype('float64')
+
+
+def ler_rodada_csv(caminho):
+    df = _normalizar_colunas(pd.read_csv(caminho))
+    textos = COLS_RODADA_STR + POSSIVEIS_NOMES_CLUBE
+    for c in COLS_RODADA_INT:
+        if c in df.columns: df[c] = _para_int(df[c])
+    if 'atletas.entrou_em_campo' in df.columns:
+        df['atletas.entrou_em_campo'] = df['atletas.entrou_em_campo'].astype(str).str.lower().eq('true')
+    # Demais colunas (preços, pontos e scouts) viram número; qualquer outra coluna de texto fica como texto
+    for c in df.columns:
+        if c in COLS_RODADA_INT or c == 'atletas.entrou_em_campo': continue
+        num = None if c in textos else _numerica(df[c])
+        df[c] = num if num is not None else _para_str(df[c])
+    return df
+
+
+def ler_confrontos_csv(caminho):
+    df = _normalizar_colunas(pd.read_csv(caminho))
+    for c in COLS_JOGO_INT:
+        if c in df.columns: df[c] = _para_int(df[c])
+    for c in df.columns:
+        if c not in COLS_JOGO_INT: df[c] = _para_str(df[c])
+    if 'Mando' in df.columns:
+        df['Mando_Padrao'] = df['Mando'].apply(lambda x: 'CASA' if 'Casa' in str(x) and 'Fora' not in str(x) else 'FORA')
+    else: df['Mando_Padrao'] = 'N/A'
+    return df
+
+
+def _ordenar_colunas(df, prioridade):
+    fixas = [c for c in prioridade if c in df.columns]
+    return df[fixas + sorted(c for c in df.columns if c not in fixas)]
+
+
+class ArmazemTemporada:
+    """Store em disco (manifesto + Feather) de uma pasta de CSVs da temporada."""
+
+    TABELAS = {
+        'rodadas': ("rodada-*.csv", ler_rodada_csv, ['atletas.atleta_id', 'atletas.rodada_id'],
+                    COLS_RODADA_INT + COLS_RODADA_NUM + COLS_RODADA_STR),
+        'confrontos': ("confrontos_*.csv", ler_confrontos_csv, ['rodada_id', 'clube_id'],
+                       COLS_JOGO_INT + ['Time', 'Adversario', 'Mando', 'Mando_Padrao']),
+    }
+
+    def __init__(self, dir_dados=".", dir_store=None):
+        self.dir_dados = dir_dados
+        self.dir_store = dir_store or os.path.join(dir_dados, DIR_STORE)
+        self.caminho_manifesto = os.path.join(self.dir_store, "manifest.json")
+
+    def _ler_manifesto(self):
+        try:
+            with open(self.caminho_manifesto, encoding='utf-8') as f:
+                m = json.load(f)
+            if m.get('schema') == VERSAO_SCHEMA: return m
+        except (OSError, ValueError): pass
+        return {'schema': VERSAO_SCHEMA, 'tabelas': {}}
+
+    def _gravar_manifesto(self, manifesto):
+        def escrever(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifesto, f, indent=1, sort_keys=True)
+        _gravar_atomico(self.caminho_manifesto, escrever)
+
+    def _caminho_tabela(self, nome):
+        return os.path.join(self.dir_store, f"{nome}.feather")
+
+    def _ler_tabela(self, nome):
+        caminho = self._caminho_tabela(nome)
+        if not os.path.exists(caminho): return None
+        return feather.read_table(caminho, memory_map=True)
+
+    def _diff(self, padrao, entradas):
+        """Separa os CSVs da pasta em inalterados e novos/alterados (por mtime+tamanho, depois hash)."""
+        arquivos = sorted(glob.glob(os.path.join(self.dir_dados, padrao)))
+        atuais, alterados = {}, []
+        for caminho in arquivos:
+            nome = os.path.basename(caminho)
+            st_ = os.stat(caminho)
+            ant = entradas.get(nome)
+            if ant and ant['mtime'] == st_.st_mtime_ns and ant['size'] == st_.st_size:
+                atuais[nome] = ant
+                continue
+            h = _hash_arquivo(caminho)
+            atuais[nome] = {'mtime': st_.st_mtime_ns, 'size': st_.st_size, 'sha1': h}
+            if not ant or ant['sha1'] != h: alterados.append(nome)
+        removidos = [n for n in entradas if n not in atuais]
+        return atuais, alterados, removidos
+
+    def _atualizar_tabela(self, nome, alterados, arquivos):
+        padrao, leitor, chave, prioridade = self.TABELAS[nome]
+        partes = []
+        antiga = self._ler_tabela(nome)
+        inalterados = [a for a in arquivos if a not in alterados]
+        if antiga is not None and antiga.num_rows and inalterados:
+            manter = pc.is_in(antiga[COL_ARQUIVO], value_set=pa.array(inalterados, type=pa.string()))
+            partes.append(antiga.filter(manter).to_pandas())
+        for arq in alterados:
+            try:
+                novo = leitor(os.path.join(self.dir_dados, arq))
+            except Exception: continue
+            novo[COL_ARQUIVO] = arq
+            partes.append(novo)
+        partes = [p for p in partes if not p.empty]
+        if not partes: return pd.DataFrame(), False
+        df = pd.concat(partes, ignore_index=True)
+        # Mesma precedência do carregamento original: arquivos em ordem alfabética, primeira ocorrência vence.
+        # As linhas repetidas continuam no store (um arquivo pode sair depois); só a leitura deduplica.
+        ordem = {a: i for i, a in enumerate(arquivos)}
+        df = df.iloc[df[COL_ARQUIVO].map(ordem).argsort(kind='stable')].reset_index(drop=True)
+        duplicado = bool(df.duplicated(subset=[c for c in chave if c in df.columns]).any())
+        return _ordenar_colunas(df, prioridade), duplicado
+
+    def sincronizar(self):
+        """Ingere apenas os CSVs novos/alterados e devolve o manifesto atualizado."""
+        os.makedirs(self.dir_store, exist_ok=True)
+        with _LOCK_SYNC, _trava_arquivo(os.path.join(self.dir_store, ".lock")):
+            return self._sincronizar()
+
+    def _sincronizar(self):
+        manifesto = self._ler_manifesto()
+        mudou = False
+        for nome, (padrao, *_resto) in self.TABELAS.items():
+            entradas = manifesto['tabelas'].get(nome, {})
+            atuais, alterados, removidos = self._diff(padrao, entradas)
+            if alterados or removidos or not os.path.exists(self._caminho_tabela(nome)):
+                df, duplicado = self._atualizar_tabela(nome, alterados, sorted(atuais))
+                tabela = pa.Table.from_pandas(df, preserve_index=False)
+                _gravar_atomico(self._caminho_tabela(nome),
+                                lambda tmp: feather.write_feather(tabela, tmp, compression='uncompressed'))
+                manifesto.setdefault('duplicatas', {})[nome] = duplicado
+                mudou = True
+            if atuais != entradas: mudou = True
+            manifesto['tabelas'][nome] = atuais
+        if mudou: self._gravar_manifesto(manifesto)
+        return manifesto
+
+    def carregar(self):
+        """Sincroniza o store e devolve (df_rodadas, df_confrontos, versao)."""
+        manifesto = self.sincronizar()
+        saida = []
+        for nome, (padrao, leitor, chave, prioridade) in self.TABELAS.items():
+            t = self._ler_tabela(nome)
+            df = t.to_pandas() if t is not None else pd.DataFrame()
+            if manifesto.get('duplicatas', {}).get(nome): df = df.drop_duplicates(subset=chave).reset_index(drop=True)
+            saida.append(df.drop(columns=[COL_ARQUIVO], errors='ignore'))
+        return saida[0], saida[1], versao_manifesto(manifesto)
+
+
+def versao_manifesto(manifesto):
+    """Identificador curto do conjunto de dados (muda quando qualquer CSV muda)."""
+    chave = json.dumps({n: {a: e['sha1'] for a, e in ent.items()} for n, ent in manifesto['tabelas'].items()},
+                       sort_keys=True)
+    return hashlib.sha1(chave.encode()).hexdigest()[:12]
+
+
+def carregar_temporada(dir_dados=".", dir_store=None):
+    """Carrega rodadas e confrontos pelo store; sem permissão de escrita, cai no parse direto dos CSVs."""
+    armazem = ArmazemTemporada(dir_dados, dir_store)
+    try:
+        return armazem.carregar()
+    except OSError:
+        pass
+    saida, manifesto = [], {'tabelas': {}}
+    for nome, (padrao, leitor, chave, prioridade) in ArmazemTemporada.TABELAS.items():
+        manifesto['tabelas'][nome] = armazem._diff(padrao, {})[0]
+        dfs = []
+        for f in sorted(glob.glob(os.path.join(dir_dados, padrao))):
+            try: dfs.append(leitor(f))
+            except Exception: pass
+        df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+        if not df.empty: df = _ordenar_colunas(df.drop_duplicates(subset=chave).reset_index(drop=True), prioridade)
+        saida.append(df)
+    return saida[0], saida[1], versao_manifesto(manifesto)
+
+
+def versao_temporada(dir_dados=".", dir_store=None):
+    """Versão atual dos dados (só `stat` nos CSVs já conhecidos; serve de chave de cache)."""
+    armazem = ArmazemTemporada(dir_dados, dir_store)
+    try:
+        return versao_manifesto(armazem.sincronizar())
+    except OSError:
+        return versao_manifesto({'tabelas': {n: armazem._diff(t[0], {})[0] for n, t in armazem.TABELAS.items()}})
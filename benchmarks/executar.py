@@ -0,0 +1,171 @@
+"""Benchmark headless dos caminhos quentes do dashboard (sem navegador, sem Streamlit).
+
+Gera uma temporada sintética (ver `sintetico.py`) e mede carga fria/quente,
+filtros da sidebar, agrupamento por janela de rodadas, pivot do Raio-X,
+ranking e projeção Monte Carlo do capitão e escalação ótima. Para cada caso reporta mediana/p95,
+throughput e pico de memória (tracemalloc, numa execução à parte para não
+distorcer o tempo). Cada execução é anexada a `benchmarks/resultados.jsonl` e
+comparada com a anterior de mesmos parâmetros.
+
+    python -m benchmarks.executar --rodadas 38 --atletas 800 [--temporadas 2]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from analises import fragilidade_adversarios, raio_x, ranking_capitao
+from armazenamento import DIR_STORE
+from benchmarks.sintetico import gerar_temporada
+from otimizador import ESQUEMAS, otimizar_escalacao
+from pipeline import preparar_temporada
+from projecao import projetar_capitaes
+
+ARQUIVO_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados.jsonl")
+LIMIAR_REGRESSAO = 0.20
+
+
+def medir(nome, fn, repeticoes, itens=1, preparar=None):
+    """Roda `fn` `repeticoes` vezes (mais uma com tracemalloc) e devolve as estatísticas do caso."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar: preparar()
+        t0 = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - t0)
+    if preparar: preparar()
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tempos = np.array(tempos)
+    mediana = float(np.median(tempos))
+    return {'caso': nome, 'itens': itens, 'mediana_ms': mediana * 1e3, 'p95_ms': float(np.percentile(tempos, 95)) * 1e3,
+            'itens_por_s': itens / mediana if mediana else float('inf'), 'pico_mb': pico / 2 ** 20}
+
+
+def filtros_aleatorios(temporada, n, rng):
+    df, col = temporada.df, temporada.col_clube
+    rodadas = np.sort(df['atletas.rodada_id'].unique())
+    clubes = sorted(df[col].dropna().unique())
+    posicoes = sorted(df['posicao_nome'].dropna().unique())
+    pmin, pmax = float(df['atletas.preco_num'].min()), float(df['atletas.preco_num'].max())
+    saida = []
+    for _ in range(n):
+        lo, hi = sorted(rng.choice(rodadas, 2))
+        p0, p1 = sorted(rng.uniform(pmin, pmax, 2))
+        saida.append(((int(lo), int(hi)), (p0, p1),
+                      tuple(rng.choice(clubes, rng.integers(1, len(clubes) + 1), replace=False)),
+                      tuple(rng.choice(posicoes, rng.integers(1, len(posicoes) + 1), replace=False)),
+                      tuple(rng.choice(['CASA', 'FORA'], rng.integers(1, 3), replace=False))))
+    return saida
+
+
+def executar(dir_dados, repeticoes=5, semente=0):
+    rng = np.random.default_rng(semente)
+    store = os.path.join(dir_dados, DIR_STORE)
+    resultados = []
+
+    limpar_store = lambda: shutil.rmtree(store, ignore_errors=True)
+    resultados.append(medir('carga_fria', lambda: preparar_temporada(dir_dados), max(1, repeticoes // 2), preparar=limpar_store))
+    temporada = preparar_temporada(dir_dados)
+    n_linhas = len(temporada.df)
+    resultados[-1]['itens'] = n_linhas
+    resultados[-1]['itens_por_s'] = n_linhas / (resultados[-1]['mediana_ms'] / 1e3)
+    resultados.append(medir('carga_quente', lambda: preparar_temporada(dir_dados), repeticoes, n_linhas))
+
+    motor, indice = temporada.motor_filtros, temporada.indice
+    combinacoes = filtros_aleatorios(temporada, 200, rng)
+    resultados.append(medir('filtros_sidebar', lambda: [motor._calcular(*f) for f in combinacoes], repeticoes, len(combinacoes)))
+    resultados.append(medir('filtros_sidebar_cache', lambda: [motor.mascaras(*f) for f in combinacoes[:50]], repeticoes, 50))
+
+    rodadas = temporada.indice.rodadas
+    janelas = [tuple(sorted(map(int, rng.choice(rodadas, 2)))) for _ in range(50)]
+    resultados.append(medir('agrupar_janela', lambda: [temporada.agrupar(j, None) for j in janelas], repeticoes, len(janelas)))
+    mascaras = [motor.mascaras(*f) for f in combinacoes[:50]]
+    resultados.append(medir('agrupar_filtrado', lambda: [temporada.agrupar(f[0], m[0]) for f, m in zip(combinacoes, mascaras)],
+                            repeticoes, len(mascaras)))
+
+    todos = (tuple(map(int, (rodadas[0], rodadas[-1]))), (0, float('inf')), (), (), ())
+    base, completo = motor.mascaras(*todos)
+    df_completo = temporada.df[completo]
+    resultados.append(medir('raio_x', lambda: raio_x(df_completo), repeticoes, len(df_completo)))
+
+    pool = temporada.agrupar(todos[0], base)
+    rodada = int(temporada.df_jogos['rodada_id'].max())
+    resultados.append(medir('ranking_capitao', lambda: ranking_capitao(pool, temporada.df_jogos, fragilidade_adversarios(df_completo), rodada),
+                            repeticoes, len(pool)))
+    resultados.append(medir('projecao_capitao', lambda: projetar_capitaes(pool, temporada.df, temporada.df_jogos, rodada), repeticoes, len(pool)))
+    resultados.append(medir('escalacao_otima', lambda: [otimizar_escalacao(pool, e, 100.0, incluir_tecnico=True, capitao_mult=1.5) for e in ESQUEMAS],
+                            repeticoes, len(ESQUEMAS)))
+    return resultados, n_linhas, len(pool)
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def anterior(parametros):
+    if not os.path.exists(ARQUIVO_RESULTADOS): return None
+    ultimo = None
+    with open(ARQUIVO_RESULTADOS, encoding='utf-8') as f:
+        for linha in f:
+            reg = json.loads(linha)
+            if reg.get('parametros') == parametros: ultimo = reg
+    return ultimo
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rodadas', type=int, default=38)
+    ap.add_argument('--atletas', type=int, default=800)
+    ap.add_argument('--temporadas', type=int, default=1)
+    ap.add_argument('--repeticoes', type=int, default=5)
+    ap.add_argument('--dir', help="pasta para os CSVs sintéticos (padrão: temporária, apagada no fim)")
+    ap.add_argument('--nao-salvar', action='store_true', help="não anexa o resultado em resultados.jsonl")
+    args = ap.parse_args(argv)
+
+    parametros = {'rodadas': args.rodadas, 'atletas': args.atletas, 'temporadas': args.temporadas}
+    dir_dados = args.dir or tempfile.mkdtemp(prefix="cartola_bench_")
+    try:
+        t0 = time.perf_counter()
+        gerar_temporada(dir_dados, args.rodadas, args.atletas, args.temporadas)
+        print(f"Temporada sintética gerada em {time.perf_counter() - t0:.1f}s ({dir_dados})")
+        resultados, n_linhas, n_pool = executar(dir_dados, args.repeticoes)
+    finally:
+        if not args.dir: shutil.rmtree(dir_dados, ignore_errors=True)
+
+    registro = {'data': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit_atual(),
+                'python': platform.python_version(), 'pandas': pd.__version__, 'parametros': parametros,
+                'linhas': n_linhas, 'atletas_pool': n_pool, 'resultados': resultados}
+    tabela = pd.DataFrame(resultados).set_index('caso')
+    ant = anterior(parametros)
+    if ant:
+        antes = pd.DataFrame(ant['resultados']).set_index('caso')['mediana_ms']
+        tabela['vs_anterior'] = (tabela['mediana_ms'] / antes - 1).map(lambda x: f"{x:+.0%}" if pd.notna(x) else '')
+    print(f"{n_linhas} linhas, {n_pool} atletas no pool")
+    print(tabela.round(2).to_string())
+    if ant:
+        piores = tabela.index[(tabela['mediana_ms'] / antes.reindex(tabela.index) - 1) > LIMIAR_REGRESSAO]
+        if len(piores): print(f"⚠️ Possível regressão vs {ant.get('commit')}: {', '.join(piores)}")
+
+    if not args.nao_salvar:
+        with open(ARQUIVO_RESULTADOS, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+if __name__ == '__main__':
+    main()
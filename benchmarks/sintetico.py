@@ -0,0 +1,117 @@
+"""Gerador de temporadas sintéticas no mesmo formato dos CSVs do repositório.
+
+Escreve `rodada-<r>[-<ano>].csv` (coluna de índice sem nome, ordem das colunas
+embaralhada por arquivo, scouts acumulados e vazios quando zero) e
+`confrontos_brasileirao_<ano>_r<r>_por_time.csv` (turno e returno completos
+pelo método do círculo). Com `temporadas > 1`, cada temporada extra usa outro
+ano e outra faixa de `atleta_id`, multiplicando o volume de linhas.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CLUBES = [(262, 'FLA', 'Flamengo'), (263, 'BOT', 'Botafogo'), (264, 'COR', 'Corinthians'), (265, 'BAH', 'Bahia'),
+          (266, 'FLU', 'Fluminense'), (267, 'VAS', 'Vasco'), (275, 'PAL', 'Palmeiras'), (276, 'SAO', 'São Paulo'),
+          (277, 'SAN', 'Santos'), (280, 'RBB', 'Red Bull Bragantino'), (282, 'CAM', 'Atlético-MG'),
+          (283, 'CRU', 'Cruzeiro'), (284, 'GRE', 'Grêmio'), (285, 'INT', 'Internacional'), (287, 'VIT', 'Vitória'),
+          (293, 'CAP', 'Athletico-PR'), (294, 'CFC', 'Coritiba'), (315, 'CHA', 'Chapecoense'), (364, 'REM', 'Remo'),
+          (2305, 'MIR', 'Mirassol')]
+# Proporção de atletas por posição no mercado real (goleiro..técnico)
+PESO_POSICAO = np.array([68, 105, 113, 221, 177, 20], dtype=float)
+MEDIA_POSICAO = np.array([2.5, 2.0, 2.2, 2.6, 2.8, 3.0])
+SCOUTS = ['G', 'A', 'FT', 'FD', 'FF', 'FS', 'PS', 'I', 'DS', 'SG', 'DE', 'GS', 'FC', 'PC', 'CA', 'CV', 'GC', 'V']
+# Média por jogo de cada scout por posição (G, L, Z, M, A, T)
+TAXA_SCOUT = {
+    'G': [0, .03, .04, .12, .3, 0], 'A': [0, .08, .02, .12, .12, 0], 'FT': [0, .02, .01, .05, .08, 0],
+    'FD': [0, .15, .08, .35, .7, 0], 'FF': [0, .3, .2, .6, .9, 0], 'FS': [0, .8, .4, 1.2, 1.4, 0],
+    'PS': [0, .01, 0, .02, .04, 0], 'I': [0, .02, 0, .05, .4, 0], 'DS': [.1, 1.8, 1.5, 1.6, .6, 0],
+    'SG': [.3, .3, .3, 0, 0, 0], 'DE': [2.5, 0, 0, 0, 0, 0], 'GS': [1.2, 0, 0, 0, 0, 0],
+    'FC': [.1, 1.1, 1.2, 1.3, 1.1, 0], 'PC': [0, .01, .02, .01, 0, 0], 'CA': [.05, .2, .22, .2, .12, 0],
+    'CV': [.01, .01, .02, .01, .01, 0], 'GC': [.01, .01, .02, 0, 0, 0], 'V': [.02, .02, .02, .02, .02, 0],
+}
+
+
+def tabela_jogos(n_clubes, rodadas):
+    """(rodada, mandante, visitante) em índices de clube; returno espelhado com mando invertido."""
+    idx = list(range(n_clubes))
+    turno = []
+    for r in range(n_clubes - 1):
+        pares = [(idx[i], idx[n_clubes - 1 - i]) for i in range(n_clubes // 2)]
+        turno.append([(a, b) if (r + i) % 2 == 0 else (b, a) for i, (a, b) in enumerate(pares)])
+        idx = [idx[0]] + [idx[-1]] + idx[1:-1]
+    jogos = turno + [[(b, a) for a, b in rod] for rod in turno]
+    return [(r + 1, a, b) for r in range(rodadas) for a, b in jogos[r % len(jogos)]]
+
+
+def gerar_temporada(destino, rodadas=38, atletas=800, temporadas=1, semente=2026):
+    """Escreve os CSVs em `destino` e devolve a lista de arquivos gerados."""
+    os.makedirs(destino, exist_ok=True)
+    rng = np.random.default_rng(semente)
+    arquivos = []
+    ids_clube = np.array([c[0] for c in CLUBES])
+    nomes = {c[0]: c[2] for c in CLUBES}
+    siglas = {c[0]: c[1] for c in CLUBES}
+
+    for s in range(temporadas):
+        ano = 2026 - s
+        sufixo = "" if temporadas == 1 else f"-{ano}"
+        posicao = rng.choice(6, size=atletas, p=PESO_POSICAO / PESO_POSICAO.sum()) + 1
+        clube = ids_clube[rng.integers(0, len(CLUBES), atletas)]
+        atleta_id = 40000 + s * 1_000_000 + np.arange(atletas) * 7
+        habilidade = rng.normal(MEDIA_POSICAO[posicao - 1], 1.5)
+        preco = np.clip(np.round(rng.gamma(2.2, 2.5, atletas) + habilidade.clip(0), 2), 0.7, 30)
+        apelidos = np.array([f"Atleta {i}" for i in range(atletas)])
+        slugs = np.array([f"atleta-{i}" for i in range(atletas)])
+        fotos = np.array([f"https://s3.glbimg.com/v1/AUTH_x/clubes_{ano}/silhuetas/{siglas[c]}/FORMATO.png" for c in clube])
+
+        jogos = tabela_jogos(len(CLUBES), rodadas)
+        mando = {}
+        for r, a, b in jogos:
+            mando[(r, ids_clube[a])], mando[(r, ids_clube[b])] = ('Casa', ids_clube[b]), ('Fora de Casa', ids_clube[a])
+
+        scouts_acum = {sc: np.zeros(atletas) for sc in SCOUTS}
+        jogos_num = np.zeros(atletas, dtype=int)
+        pontos_acum = np.zeros(atletas)
+        for r in range(1, rodadas + 1):
+            em_campo = rng.random(atletas) < 0.55
+            casa = np.array([mando.get((r, c), ('Casa', 0))[0] == 'Casa' for c in clube])
+            pontos = np.where(em_campo, np.round(rng.normal(habilidade + 0.4 * casa, 3.0), 1), 0.0)
+            for sc in SCOUTS:
+                taxa = np.array(TAXA_SCOUT[sc])[posicao - 1]
+                scouts_acum[sc] += np.where(em_campo, rng.poisson(taxa), 0)
+            jogos_num += em_campo
+            pontos_acum += pontos
+            variacao = np.where(em_campo, np.round((pontos - 2.5) * 0.15, 2), 0.0)
+            preco = np.clip(np.round(preco + variacao, 2), 0.7, 40)
+            media = np.where(jogos_num > 0, np.round(pontos_acum / np.maximum(jogos_num, 1), 2), 0.0)
+
+            dados = {
+                'atletas.clube_id': clube, 'atletas.apelido_abreviado': apelidos, 'atletas.apelido': apelidos,
+                'atletas.pontos_num': pontos, 'atletas.atleta_id': atleta_id, 'atletas.rodada_id': r,
+                'atletas.entrou_em_campo': em_campo, 'atletas.slug': slugs, 'atletas.posicao_id': posicao,
+                'atletas.preco_num': preco, 'atletas.media_num': media,
+                'atletas.status_id': rng.choice([2, 3, 5, 6, 7], atletas, p=[.02, .01, .06, .63, .28]),
+                'atletas.jogos_num': jogos_num, 'atletas.foto': fotos, 'atletas.nome': apelidos,
+                'atletas.clube.id.full.name': [siglas[c] for c in clube], 'atletas.variacao_num': variacao,
+            }
+            for sc in SCOUTS:
+                dados[sc] = np.where(scouts_acum[sc] > 0, scouts_acum[sc], np.nan)
+            df = pd.DataFrame(dados)
+            # Cada rodada real vem com as colunas numa ordem diferente
+            df = df[list(rng.permutation(df.columns))]
+            caminho = os.path.join(destino, f"rodada-{r}{sufixo}.csv")
+            df.to_csv(caminho)
+            arquivos.append(caminho)
+
+            conf = []
+            for c in ids_clube:
+                m, adv = mando[(r, c)]
+                dia = pd.Timestamp(ano, 1, 28) + pd.Timedelta(days=7 * (r - 1) + int(rng.integers(0, 3)))
+                conf.append({'rodada_id': r, 'clube_id': c, 'Time': nomes[c], 'Adversario': nomes[adv], 'Mando': m,
+                             'Data': dia.strftime('%d/%m/%Y'), 'Hora': rng.choice(['16:00', '19:00', '21:30']),
+                             'Estadio': f"Estádio {siglas[c if m == 'Casa' else adv]}"})
+            caminho = os.path.join(destino, f"confrontos_brasileirao_{ano}_r{r}_por_time.csv")
+            pd.DataFrame(conf).to_csv(caminho, index=False)
+            arquivos.append(caminho)
+    return arquivos
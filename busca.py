@@ -0,0 +1,95 @@
+"""Busca de atletas por apelido, nome e slug, sem acento e tolerante a erro de digitação.
+
+O índice é montado uma vez por temporada: cada texto (um por atleta e campo)
+vira trigramas das palavras, com um espaço antes de cada uma, e as palavras
+também ficam numa lista ordenada para busca por prefixo. A consulta sai de um
+`bincount` sobre as listas de trigramas dela: a fração de trigramas da consulta
+presentes no texto, mais bônus para texto igual, começo do texto e começo de
+palavra, ponderada pelo campo. Cada atleta fica com o melhor texto dele. Como
+a consulta não leva espaço no fim, o que está sendo digitado casa como prefixo.
+"""
+import numpy as np
+
+from texto import normalizar_texto
+
+PESOS_CAMPO = {'atletas.apelido': 1.0, 'atletas.apelido_abreviado': 0.9, 'atletas.nome': 0.8, 'atletas.slug': 0.7}
+LIMIAR_SIMILARIDADE = 0.5
+# Descarta quem fica abaixo desta fração do melhor resultado ("joao" não traz "Joaquín" se há "João")
+CORTE_RELATIVO = 0.5
+BONUS_IGUAL, BONUS_INICIO, BONUS_PALAVRA = 1.0, 0.5, 0.3
+
+
+def _trigramas(s):
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class IndiceBusca:
+    def __init__(self, ids, campos):
+        """`ids`: atleta_id de cada posição; `campos`: nome do campo -> textos alinhados com `ids`."""
+        self.ids = np.asarray(ids)
+        textos, atleta, peso = [], [], []
+        for campo, valores in campos.items():
+            for i, v in enumerate(valores):
+                t = normalizar_texto(v)
+                if t:
+                    textos.append(t); atleta.append(i); peso.append(PESOS_CAMPO.get(campo, 0.5))
+        self._textos = textos
+        self._atleta = np.array(atleta, dtype=np.int64)
+        self._peso = np.array(peso)
+
+        postings = {}
+        palavras = []
+        for d, t in enumerate(textos):
+            for g in _trigramas(' ' + t + ' '): postings.setdefault(g, []).append(d)
+            palavras.extend((p, d) for p in t.split())
+        self._postings = {g: np.array(ds, dtype=np.int64) for g, ds in postings.items()}
+        palavras.sort()
+        self._palavras = np.array([p for p, _ in palavras], dtype=object)
+        self._palavra_doc = np.array([d for _, d in palavras], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _docs_com_prefixo(self, q):
+        ini = np.searchsorted(self._palavras, q, side='left')
+        fim = np.searchsorted(self._palavras, q + '\x7f', side='left')
+        return self._palavra_doc[ini:fim]
+
+    def pontuar(self, consulta):
+        """Pontuação de cada atleta (alinhada com `ids`); 0 = não casou."""
+        q = normalizar_texto(consulta)
+        n_docs = len(self._textos)
+        if not q or not n_docs: return np.zeros(len(self.ids))
+        grams = [g for g in _trigramas(' ' + q) if g in self._postings]
+        n_grams = max(len(_trigramas(' ' + q)), 1)
+        sim = (np.bincount(np.concatenate([self._postings[g] for g in grams]), minlength=n_docs) / n_grams
+               if grams else np.zeros(n_docs))
+        bonus = np.zeros(n_docs)
+        bonus[self._docs_com_prefixo(q.split()[-1])] = BONUS_PALAVRA
+        # Bônus de texto igual / início só para quem já casou
+        for d in np.flatnonzero((sim >= LIMIAR_SIMILARIDADE) | (bonus > 0)):
+            t = self._textos[d]
+            if t == q: bonus[d] += BONUS_IGUAL
+            elif t.startswith(q): bonus[d] += BONUS_INICIO
+        doc = np.where((sim >= LIMIAR_SIMILARIDADE) | (bonus > 0), (sim + bonus) * self._peso, 0.0)
+        score = np.zeros(len(self.ids))
+        np.maximum.at(score, self._atleta, doc)
+        return score
+
+    def buscar(self, consulta, limite=20, candidatos=None, corte_relativo=CORTE_RELATIVO):
+        """atleta_ids do melhor para o pior casamento; `candidatos` restringe a um subconjunto de ids."""
+        score = self.pontuar(consulta)
+        if candidatos is not None: score = np.where(np.isin(self.ids, np.asarray(candidatos)), score, 0.0)
+        achados = np.flatnonzero(score > max(score.max(initial=0.0) * corte_relativo, 0.0))
+        ordem = achados[np.argsort(-score[achados], kind='stable')]
+        return self.ids[ordem[:limite] if limite else ordem]
+
+
+def indice_atletas(df, dim_atletas):
+    """Índice sobre o último apelido de cada atleta no fato + nome/apelido abreviado/slug da dimensão."""
+    apelidos = df.groupby('atletas.atleta_id', observed=True)['atletas.apelido'].last()
+    ids = apelidos.index.union(dim_atletas.index)
+    campos = {'atletas.apelido': apelidos.reindex(ids).astype(object).to_numpy()}
+    for c in ('atletas.apelido_abreviado', 'atletas.nome', 'atletas.slug'):
+        if c in dim_atletas.columns: campos[c] = dim_atletas[c].reindex(ids).astype(object).to_numpy()
+    return IndiceBusca(ids.to_numpy(), campos)
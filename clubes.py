@@ -0,0 +1,95 @@
+"""Identidade dos clubes e força dos confrontos.
+
+Os CSVs chamam o mesmo clube de jeitos diferentes: `clube_id`, a sigla das
+rodadas ("FLU", "CAM", "INT") e o nome completo dos confrontos (`Time` e
+`Adversario`, ex.: "Internacional"). `TabelaClubes` junta tudo numa chave
+única (`clube_id`) e resolve qualquer um desses rótulos, sem diferenciar
+acentos e caixa. `forca_confrontos` calcula mandante x visitante de todas as
+rodadas de uma vez, com merges em vez de varrer a tabela jogo a jogo.
+"""
+import numpy as np
+import pandas as pd
+
+from texto import normalizar_texto
+
+
+def normalizar_nome(valor):
+    """Minúsculas, sem acentos e só letras/dígitos ("Grêmio" -> "gremio", "Atlético-MG" -> "atleticomg")."""
+    return normalizar_texto(valor).replace(' ', '')
+
+
+class TabelaClubes:
+    def __init__(self, df, df_jogos, col_clube):
+        siglas = (df[['atletas.clube_id', col_clube]].dropna()
+                  .groupby('atletas.clube_id', observed=True)[col_clube].agg(lambda s: s.mode().iat[0]))
+        tabela = pd.DataFrame({'sigla': siglas})
+        if not df_jogos.empty and 'Time' in df_jogos.columns:
+            nomes = df_jogos[['clube_id', 'Time']].dropna().groupby('clube_id')['Time'].agg(lambda s: s.mode().iat[0])
+            tabela = tabela.join(nomes.rename('nome'), how='outer')
+        else: tabela['nome'] = np.nan
+        tabela.index.name = 'clube_id'
+        # col_clube é categórica no schema compacto; em object, clubes que só aparecem nos confrontos
+        # (sem nenhuma linha nas rodadas) recebem o nome como sigla sem estourar as categorias
+        tabela = tabela.astype({'sigla': object, 'nome': object})
+        tabela['nome'] = tabela['nome'].fillna(tabela['sigla']).fillna(pd.Series('ID ' + tabela.index.astype(str), index=tabela.index))
+        tabela['sigla'] = tabela['sigla'].fillna(tabela['nome'])
+        self.tabela = tabela.reset_index()
+
+        # Apelidos normalizados -> clube_id (id, sigla e nome completo)
+        apelidos = {}
+        for r in self.tabela.itertuples(index=False):
+            for a in (r.clube_id, r.sigla, r.nome):
+                apelidos.setdefault(normalizar_nome(a), r.clube_id)
+        self.apelidos = apelidos
+        self._nome = self.tabela.set_index('clube_id')['nome']
+        self._sigla = self.tabela.set_index('clube_id')['sigla']
+
+    def resolver(self, valores):
+        """clube_id de cada rótulo (sigla, nome ou id); <NA> quando não reconhece."""
+        valores = pd.Series(valores)
+        chaves = pd.Series({v: normalizar_nome(v) for v in valores.dropna().unique()}, dtype=object)
+        return valores.map(chaves).map(self.apelidos).astype('Int64')
+
+    def nome(self, clube_ids):
+        return pd.Series(clube_ids).map(self._nome)
+
+    def sigla(self, clube_ids):
+        return pd.Series(clube_ids).map(self._sigla)
+
+
+def rotulo_favoritismo(delta):
+    return np.select([delta > 10, delta < -10, delta > 0, delta < 0],
+                     ["🟢 Mandante Forte", "🔴 Visitante Forte", "🟢 Leve Mandante", "🔴 Leve Visitante"],
+                     default="⚪ Equilibrado")
+
+
+def forca_confrontos(df, df_jogos, tabela_clubes):
+    """Uma linha por jogo (lado mandante) de todas as rodadas, com força casa/fora e favoritismo.
+
+    Força = média de pontos dos atletas do clube jogando com aquele mando em toda a base.
+    """
+    if df_jogos.empty: return pd.DataFrame()
+    stats = df.groupby(['atletas.clube_id', 'Mando_Padrao'], observed=True)['atletas.pontos_num'].mean().unstack()
+    for m in ('CASA', 'FORA'):
+        if m not in stats.columns: stats[m] = np.nan
+
+    jogos = df_jogos[df_jogos['Mando_Padrao'] == 'CASA'].copy()
+    jogos['adversario_id'] = tabela_clubes.resolver(jogos['Adversario'].to_numpy()).to_numpy()
+    jogos = jogos.merge(stats['CASA'].rename('Força Casa'), left_on='clube_id', right_index=True, how='left')
+    jogos = jogos.merge(stats['FORA'].rename('Força Fora'), left_on='adversario_id', right_index=True, how='left')
+    jogos[['Força Casa', 'Força Fora']] = jogos[['Força Casa', 'Força Fora']].fillna(0)
+
+    for c in ('Data', 'Hora', 'Estadio'):
+        if c not in jogos.columns: jogos[c] = ''
+    visitante = tabela_clubes.nome(jogos['adversario_id'].to_numpy()).to_numpy()
+    delta = (jogos['Força Casa'] - jogos['Força Fora']).to_numpy()
+    return pd.DataFrame({
+        'rodada_id': jogos['rodada_id'].to_numpy(),
+        "Data/Hora": (jogos['Data'].fillna('') + ' ' + jogos['Hora'].fillna('')).to_numpy(),
+        "Mandante": tabela_clubes.nome(jogos['clube_id'].to_numpy()).to_numpy(),
+        "Força Casa": jogos['Força Casa'].to_numpy(),
+        "Visitante": np.where(pd.isna(visitante), jogos['Adversario'].to_numpy(), visitante),
+        "Força Fora": jogos['Força Fora'].to_numpy(),
+        "Favoritismo": rotulo_favoritismo(delta),
+        "Local": jogos['Estadio'].fillna('').to_numpy(),
+    }).sort_values('rodada_id', kind='stable').reset_index(drop=True)
@@ -0,0 +1,73 @@
+"""Schema tipado e compacto da temporada processada.
+
+Depois do merge com os confrontos quase tudo é float64 ou string Python.
+`compactar_temporada` reduz scouts a inteiros pequenos, preço/pontos a float32
+e strings repetidas a categóricas. Os atributos estáticos de cada atleta (foto,
+nome, slug) saem para uma tabela dimensão indexada por `atletas.atleta_id`.
+`relatorio_memoria` mede o antes/depois no pipeline real (`python esquema.py [pasta_de_dados]`).
+"""
+import numpy as np
+import pandas as pd
+
+COLS_DIMENSAO = ['atletas.foto', 'atletas.nome', 'atletas.slug', 'atletas.apelido_abreviado']
+COLS_FLOAT32 = ['atletas.pontos_num', 'atletas.preco_num', 'atletas.media_num', 'atletas.variacao_num', 'tamanho_visual']
+COLS_INTEIRAS = {'atletas.atleta_id': np.int32, 'atletas.clube_id': np.int32, 'atletas.rodada_id': np.int16,
+                 'atletas.posicao_id': np.int8, 'atletas.status_id': np.int8, 'atletas.jogos_num': np.int16}
+COLS_CATEGORICAS = ['atletas.apelido', 'posicao_nome', 'Mando_Padrao', 'Adversario', 'Estadio', 'Data', 'Hora']
+# Chaves do merge com os confrontos, iguais a atletas.rodada_id / atletas.clube_id
+COLS_REDUNDANTES = ['rodada_id', 'clube_id']
+
+
+def _inteiro_compacto(serie):
+    """Menor inteiro (int8/int16/int32) que comporta a série; None se ela tem fração."""
+    v = serie.fillna(0).to_numpy(dtype=np.float64)
+    if not np.array_equal(v, np.round(v)): return None
+    for tipo in (np.int8, np.int16, np.int32):
+        info = np.iinfo(tipo)
+        if v.size == 0 or (v.min() >= info.min and v.max() <= info.max): return v.astype(tipo)
+    return None
+
+
+def compactar_temporada(df, col_clube, cols_contagem):
+    """Devolve (fato, dim_atletas). `cols_contagem`: scouts e totais derivados deles."""
+    df = df.drop(columns=[c for c in COLS_REDUNDANTES if c in df.columns])
+
+    cols_dim = [c for c in COLS_DIMENSAO if c in df.columns]
+    dim = (df[['atletas.atleta_id', 'atletas.rodada_id'] + cols_dim]
+           .sort_values('atletas.rodada_id', kind='stable')
+           .drop_duplicates('atletas.atleta_id', keep='last')
+           .drop(columns='atletas.rodada_id')
+           .set_index('atletas.atleta_id').sort_index())
+    dim.index = dim.index.astype(np.int32)
+
+    fato = df.drop(columns=cols_dim).reset_index(drop=True)
+    for c, tipo in COLS_INTEIRAS.items():
+        if c in fato.columns: fato[c] = fato[c].fillna(0).astype(tipo)
+    for c in cols_contagem:
+        if c in fato.columns:
+            compacta = _inteiro_compacto(fato[c])
+            fato[c] = compacta if compacta is not None else fato[c].astype(np.float32)
+    for c in COLS_FLOAT32:
+        if c in fato.columns: fato[c] = fato[c].astype(np.float32)
+    for c in COLS_CATEGORICAS + [col_clube]:
+        if c in fato.columns: fato[c] = fato[c].astype('category')
+    return fato, dim
+
+
+def relatorio_memoria(**tabelas):
+    """Linhas, colunas e MB (deep) de cada DataFrame informado."""
+    linhas = [{'tabela': nome, 'linhas': len(t), 'colunas': t.shape[1],
+               'MB': t.memory_usage(deep=True).sum() / 2 ** 20} for nome, t in tabelas.items()]
+    return pd.DataFrame(linhas).set_index('tabela')
+
+
+if __name__ == '__main__':
+    import sys
+
+    from pipeline import estagio_bruto, estagio_enriquecido, estagio_tipado, montar_temporada
+
+    # Antes: o frame enriquecido (merge com confrontos) que o app segurava; depois: a Temporada montada
+    df, df_jogos, col_clube = estagio_tipado(*estagio_bruto(sys.argv[1] if len(sys.argv) > 1 else "."))
+    enriquecido = estagio_enriquecido(df, df_jogos)
+    t = montar_temporada(enriquecido, df_jogos, col_clube)
+    print(relatorio_memoria(enriquecido=enriquecido, fato=t.df, dim_atletas=t.dim_atletas).round(2).to_string())
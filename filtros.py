@@ -0,0 +1,81 @@
+"""Motor dos filtros globais da sidebar.
+
+Clube, posição e mando viram códigos inteiros com um bitmap (bits empacotados)
+por valor; rodada usa bitmaps acumulados "rodada <= r", de modo que qualquer
+intervalo é um AND/NOT de dois deles. Uma combinação de filtros é resolvida
+com operações bit a bit, sem DataFrames intermediários, e o resultado fica
+num cache LRU limitado, compartilhado entre as sessões.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class MotorFiltros:
+    def __init__(self, df, col_clube, tamanho_cache=128):
+        self.n = len(df)
+        self._preco = df['atletas.preco_num'].to_numpy(dtype=np.float64)
+        self.dimensoes = {}
+        for nome, col in (('clube', col_clube), ('posicao', 'posicao_nome'), ('mando', 'Mando_Padrao')):
+            codigos, valores = pd.factorize(df[col], sort=True)
+            bitmaps = {v: self._bitmap(codigos == i) for i, v in enumerate(valores)}
+            self.dimensoes[nome] = (bitmaps, bool((codigos < 0).any()))
+
+        self.rodadas, r = np.unique(df['atletas.rodada_id'].to_numpy(), return_inverse=True)
+        self._ate_rodada = [self._bitmap(r <= i) for i in range(len(self.rodadas))]
+        self._vazio = self._bitmap(np.zeros(self.n, dtype=bool))
+
+        self.tamanho_cache = tamanho_cache
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bitmap(self, mascara):
+        return np.packbits(mascara)
+
+    def _mascara(self, bitmap):
+        m = np.unpackbits(bitmap, count=self.n).view(bool)
+        m.flags.writeable = False
+        return m
+
+    def _bitmap_rodadas(self, min_rodada, max_rodada):
+        i = np.searchsorted(self.rodadas, min_rodada, 'left')
+        j = np.searchsorted(self.rodadas, max_rodada, 'right')
+        if i >= j: return self._vazio
+        bm = self._ate_rodada[j - 1]
+        return bm & ~self._ate_rodada[i - 1] if i > 0 else bm
+
+    def _bitmap_dimensao(self, nome, selecionados):
+        """União dos bitmaps dos valores selecionados; None quando o filtro não restringe nada."""
+        bitmaps, tem_nulo = self.dimensoes[nome]
+        sel = [bitmaps[v] for v in set(selecionados) if v in bitmaps]
+        # Multiselect vazio = sem filtro (mesmo comportamento de antes); tudo marcado também, se não há nulos
+        if not selecionados or (len(sel) == len(bitmaps) and not tem_nulo): return None
+        return np.bitwise_or.reduce(sel) if sel else self._vazio
+
+    def _calcular(self, rodada_range, preco_range, clubes, posicoes, mandos):
+        bm = self._bitmap_rodadas(*rodada_range)
+        for nome, sel in (('clube', clubes), ('posicao', posicoes), ('mando', mandos)):
+            b = self._bitmap_dimensao(nome, sel)
+            if b is not None: bm = bm & b
+        base = self._mascara(bm)
+        preco = (self._preco >= preco_range[0]) & (self._preco <= preco_range[1])
+        completo = self._mascara(bm & self._bitmap(preco))
+        return base, completo
+
+    def mascaras(self, rodada_range, preco_range, clubes=(), posicoes=(), mandos=()):
+        """(mascara_base, mascara_completo): bool por linha, somente leitura.
+
+        `mascara_base` aplica rodadas + clube/posição/mando; `mascara_completo` também o preço.
+        """
+        chave = (tuple(rodada_range), tuple(preco_range), frozenset(clubes), frozenset(posicoes), frozenset(mandos))
+        with self._lock:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                return self._cache[chave]
+        resultado = self._calcular(*chave)
+        with self._lock:
+            self._cache[chave] = resultado
+            while len(self._cache) > self.tamanho_cache: self._cache.popitem(last=False)
+        return resultado
@@ -0,0 +1,78 @@
+"""Figuras do dashboard com nível de detalhe proporcional ao volume de dados.
+
+A dispersão da Valorização tem um ponto por atleta por rodada e cresce com a
+temporada. Em `Automático`, até `LIMIAR_PONTOS` pontos vão todos (em WebGL a
+partir de `LIMIAR_WEBGL`); acima disso vira um ponto por atleta (médias do
+período) e, se ainda passar do limite, um mapa de densidade binado no servidor,
+cujo tamanho só depende do número de bins. As figuras são puras: quem chama
+cacheia por versão + filtros.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+LIMIAR_WEBGL = 1_000
+LIMIAR_PONTOS = 5_000
+BINS_DENSIDADE = 40
+MODOS_DISPERSAO = ['Automático', 'Todos os pontos', 'Média por atleta', 'Densidade']
+
+COL_X, COL_Y = 'atletas.preco_num', 'atletas.pontos_num'
+
+
+def _render_mode(n):
+    return 'webgl' if n > LIMIAR_WEBGL else 'svg'
+
+
+def media_por_atleta(df):
+    """Um ponto por atleta: preço e pontos médios no recorte, jogos e último apelido/posição."""
+    g = df.groupby('atletas.atleta_id', observed=True, sort=False)
+    out = g.agg(**{COL_X: (COL_X, 'mean'), COL_Y: (COL_Y, 'mean'), 'jogos': (COL_Y, 'size'),
+                   'atletas.apelido': ('atletas.apelido', 'last'), 'posicao_nome': ('posicao_nome', 'last')})
+    return out.reset_index()
+
+
+def resolver_modo(modo, n_linhas, n_atletas):
+    if modo != 'Automático': return modo
+    if n_linhas <= LIMIAR_PONTOS: return 'Todos os pontos'
+    return 'Média por atleta' if n_atletas <= LIMIAR_PONTOS else 'Densidade'
+
+
+def dispersao_valorizacao(df, modo='Automático'):
+    """Preço x pontos no nível de detalhe pedido. Devolve (figura, modo efetivo, pontos enviados)."""
+    if df.empty: return go.Figure(), modo, 0
+    modo = resolver_modo(modo, len(df), df['atletas.atleta_id'].nunique())
+    ordem = {'posicao_nome': sorted(df['posicao_nome'].dropna().unique())}
+
+    if modo == 'Todos os pontos':
+        fig = px.scatter(df[[COL_X, COL_Y, 'posicao_nome', 'atletas.apelido']], x=COL_X, y=COL_Y, color='posicao_nome',
+                         hover_name='atletas.apelido', category_orders=ordem, render_mode=_render_mode(len(df)))
+        return fig, modo, len(df)
+
+    if modo == 'Média por atleta':
+        m = media_por_atleta(df)
+        fig = px.scatter(m, x=COL_X, y=COL_Y, color='posicao_nome', size='jogos', size_max=14,
+                         hover_name='atletas.apelido', category_orders=ordem, render_mode=_render_mode(len(m)),
+                         labels={COL_X: 'Preço médio', COL_Y: 'Pontos médios'})
+        return fig, modo, len(m)
+
+    # Densidade: histograma 2D calculado aqui; o navegador recebe só BINS_DENSIDADE² células
+    x, y = df[COL_X].to_numpy(float), df[COL_Y].to_numpy(float)
+    ok = np.isfinite(x) & np.isfinite(y)
+    cont, bx, by = np.histogram2d(x[ok], y[ok], bins=BINS_DENSIDADE)
+    cont = np.where(cont > 0, cont, np.nan).T
+    fig = go.Figure(go.Heatmap(x=(bx[:-1] + bx[1:]) / 2, y=(by[:-1] + by[1:]) / 2, z=cont, colorscale='Viridis',
+                               hovertemplate="Preço %{x:.1f} | Pontos %{y:.1f}<br>%{z:.0f} jogos<extra></extra>"))
+    fig.update_layout(xaxis_title=COL_X, yaxis_title=COL_Y)
+    return fig, modo, int(np.isfinite(cont).sum())
+
+
+def mapa_raio_x(p):
+    return px.imshow(p, text_auto=".1f", color_continuous_scale="Reds")
+
+
+def barras_media_clubes(g, col_clube):
+    return px.bar(g, x='atletas.pontos_num', y=col_clube, orientation='h', title="Média Pts")
+
+
+def barras_casa_fora(g, col_clube):
+    return px.bar(g, x=col_clube, y='scouts_ofensivos_total', color='Mando_Padrao', barmode='group')
@@ -0,0 +1,83 @@
+"""Índice atleta × rodada para agregar qualquer intervalo de rodadas sem sort + groupby.
+
+Montado uma vez por versão dos dados: guarda a soma acumulada dos pontos e da
+presença por rodada e, para cada (atleta, rodada), a última linha conhecida
+até ali. Uma janela `(min_rodada, max_rodada)` vira uma subtração de prefixos
+e um lookup das últimas linhas (preço/clube/posição/scouts, que no Cartola
+já são acumulados). Com filtros por linha (clube, mando, preço) a agregação
+usa uma ordenação (atleta, rodada) pré-calculada, também sem groupby.
+"""
+import numpy as np
+import pandas as pd
+
+PESOS_PONTUACAO_BASICA = {'DS': 1.2, 'DE': 1.0, 'SG': 5.0, 'FS': 0.5, 'FD': 1.2, 'FT': 3.0, 'FF': 0.8, 'PS': 1.0, 'DP': 7.0}
+
+
+def pontuacao_basica(df):
+    """Pontuação sem gols/assistências (só scouts de regularidade)."""
+    return sum(df[s] * p for s, p in PESOS_PONTUACAO_BASICA.items())
+
+
+class IndiceRodadas:
+    def __init__(self, df, cols_ultimo, col_pontos='atletas.pontos_num'):
+        ids = df['atletas.atleta_id'].to_numpy()
+        rodadas = df['atletas.rodada_id'].to_numpy()
+        self.atletas, self._a = np.unique(ids, return_inverse=True)
+        self.rodadas, self._r = np.unique(rodadas, return_inverse=True)
+        self._rodada_linha = rodadas
+        self._pontos = df[col_pontos].fillna(0).to_numpy(dtype=np.float64)
+        nA, nR = len(self.atletas), len(self.rodadas)
+
+        grade_pts = np.zeros((nA, nR))
+        grade_pts[self._a, self._r] = self._pontos
+        grade_linha = np.full((nA, nR), -1, dtype=np.int64)
+        grade_linha[self._a, self._r] = np.arange(len(df))
+        self.cum_pontos = np.zeros((nA, nR + 1))
+        np.cumsum(grade_pts, axis=1, out=self.cum_pontos[:, 1:])
+        self.cum_presenca = np.zeros((nA, nR + 1), dtype=np.int32)
+        np.cumsum(grade_linha >= 0, axis=1, out=self.cum_presenca[:, 1:])
+
+        # Última linha de cada atleta com rodada <= r (forward-fill da grade)
+        col = np.where(grade_linha >= 0, np.arange(nR), -1)
+        np.maximum.accumulate(col, axis=1, out=col)
+        self.ultima_linha = np.where(col >= 0, np.take_along_axis(grade_linha, np.maximum(col, 0), axis=1), -1)
+
+        # Linhas ordenadas por (atleta, rodada) para o caminho com máscara
+        self._ordem = np.lexsort((self._r, self._a))
+        self.cols_ultimo = [c for c in cols_ultimo if c in df.columns]
+        self._atributos = {c: df[c].array for c in self.cols_ultimo}
+
+    def _janela(self, min_rodada, max_rodada):
+        return np.searchsorted(self.rodadas, min_rodada, 'left'), np.searchsorted(self.rodadas, max_rodada, 'right')
+
+    def _montar(self, atletas_idx, linhas, pontos):
+        out = pd.DataFrame({'atletas.atleta_id': self.atletas[atletas_idx], 'pontuacao_total_periodo': np.round(pontos, 2),
+                            **{c: arr.take(linhas) for c, arr in self._atributos.items()}})
+        out['pontuacao_basica_atual'] = pontuacao_basica(out)
+        return out
+
+    def agregar(self, min_rodada, max_rodada, mascara=None):
+        """Soma dos pontos + valores da última rodada por atleta na janela.
+
+        `mascara` (bool por linha do DataFrame indexado) restringe as linhas consideradas;
+        se ela não remove nada além da janela, usa o caminho por prefixos.
+        """
+        i, j = self._janela(min_rodada, max_rodada)
+        if i >= j: return pd.DataFrame()
+        presenca = self.cum_presenca[:, j] - self.cum_presenca[:, i]
+        if mascara is not None:
+            mascara = mascara & (self._rodada_linha >= min_rodada) & (self._rodada_linha <= max_rodada)
+            if mascara.sum() == presenca.sum(): mascara = None
+        if mascara is None:
+            atletas_idx = np.flatnonzero(presenca)
+            if not len(atletas_idx): return pd.DataFrame()
+            pontos = self.cum_pontos[atletas_idx, j] - self.cum_pontos[atletas_idx, i]
+            return self._montar(atletas_idx, self.ultima_linha[atletas_idx, j - 1], pontos)
+
+        sel = self._ordem[mascara[self._ordem]]
+        if not len(sel): return pd.DataFrame()
+        grp = self._a[sel]
+        fim = np.r_[grp[1:] != grp[:-1], True]
+        atletas_idx = grp[fim]
+        pontos = np.bincount(grp, weights=self._pontos[sel], minlength=len(self.atletas))[atletas_idx]
+        return self._montar(atletas_idx, sel[fim], pontos)
@@ -0,0 +1,136 @@
+"""Escalação ótima (exata) sob orçamento em C$.
+
+Knapsack por posição: os preços viram centavos, e um DP percorre os jogadores
+posição a posição com estado (capitão já escolhido?, jogadores da posição,
+custo). Antes do DP, cada posição descarta quem é dominado (mais caro e pior)
+por pelo menos `q` outros, o que reduz o mercado inteiro a poucas dezenas de
+candidatos. Não depende do Streamlit.
+"""
+import numpy as np
+import pandas as pd
+
+ESQUEMAS = {
+    "4-3-3": {'Goleiro': 1, 'Lateral': 2, 'Zagueiro': 2, 'Meia': 3, 'Atacante': 3, 'Técnico': 0},
+    "3-4-3": {'Goleiro': 1, 'Lateral': 0, 'Zagueiro': 3, 'Meia': 4, 'Atacante': 3, 'Técnico': 0},
+    "3-5-2": {'Goleiro': 1, 'Lateral': 0, 'Zagueiro': 3, 'Meia': 5, 'Atacante': 2, 'Técnico': 0},
+    "4-4-2": {'Goleiro': 1, 'Lateral': 2, 'Zagueiro': 2, 'Meia': 4, 'Atacante': 2, 'Técnico': 0},
+    "5-3-2": {'Goleiro': 1, 'Lateral': 2, 'Zagueiro': 3, 'Meia': 3, 'Atacante': 2, 'Técnico': 0},
+}
+MULT_CAPITAO = 1.5
+
+
+def _nao_dominados(custos, pontos, q):
+    """Índices dos jogadores que não têm `q` ou mais alternativas tão baratas e tão boas quanto eles."""
+    n = len(custos)
+    if n <= q: return np.arange(n)
+    ordem = np.lexsort((-pontos, custos))
+    w, v = custos[ordem], pontos[ordem]
+    # j domina i se não é mais caro nem pior; empates resolvidos pela ordem (o primeiro domina)
+    domina = (w[:, None] <= w[None, :]) & (v[:, None] >= v[None, :])
+    domina &= np.triu(np.ones((n, n), dtype=bool), k=1) | (w[:, None] < w[None, :]) | (v[:, None] > v[None, :])
+    np.fill_diagonal(domina, False)
+    return np.sort(ordem[domina.sum(axis=0) < q])
+
+
+def otimizar_escalacao(pool, esquema, orcamento, incluir_tecnico=False, capitao_mult=None,
+                       col_pontos='pontuacao_total_periodo', col_preco='atletas.preco_num', col_posicao='posicao_nome'):
+    """Melhor time do `pool` para o esquema e orçamento dados.
+
+    Devolve as linhas escolhidas do `pool` com a coluna `capitao` (o capitão, se `capitao_mult`
+    foi informado, tem a pontuação multiplicada no objetivo). DataFrame vazio se não há time viável.
+    """
+    vagas = dict(ESQUEMAS[esquema] if isinstance(esquema, str) else esquema)
+    if incluir_tecnico: vagas['Técnico'] = max(vagas.get('Técnico', 0), 1)
+    vagas = {p: q for p, q in vagas.items() if q > 0}
+    cap = bool(capitao_mult)
+    C = int(np.floor(orcamento * 100 + 1e-6))
+    if pool.empty or C < 0 or not vagas: return pool.iloc[0:0].assign(capitao=False)
+
+    pos = pool[col_posicao].to_numpy()
+    custo_total = np.round(pd.to_numeric(pool[col_preco], errors='coerce').fillna(0).to_numpy() * 100).astype(np.int64)
+    pontos_total = pd.to_numeric(pool[col_pontos], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    candidatos = {}
+    for p, q in vagas.items():
+        linhas = np.flatnonzero((pos == p) & (custo_total <= C))
+        if len(linhas) < q: return pool.iloc[0:0].assign(capitao=False)
+        candidatos[p] = linhas[_nao_dominados(custo_total[linhas], pontos_total[linhas], q)]
+    # Orçamento acima do time mais caro possível não muda a solução; limita o tamanho do DP
+    teto = sum(int(np.sort(custo_total[candidatos[p]])[-q:].sum()) for p, q in vagas.items())
+    C = min(C, max(teto, 0))
+
+    F = 2 if cap else 1
+    base = np.full((F, C + 1), -np.inf)
+    base[0] = 0.0
+    etapas = []  # (posição, q, linhas no pool, custos, escolhas por jogador)
+    for p, q in vagas.items():
+        linhas = candidatos[p]
+        w, v = custo_total[linhas], pontos_total[linhas]
+        pode_capitao = cap and p != 'Técnico'
+
+        dp = np.full((F, q + 1, C + 1), -np.inf)
+        dp[:, 0] = base
+        escolhas = np.zeros((len(linhas), F, q + 1, C + 1), dtype=np.int8)
+        cand = np.empty((q, C + 1))
+        cand_cap = np.empty((q, C + 1))
+        for k in range(len(linhas)):
+            wk, vk = w[k], v[k]
+            n = C + 1 - wk
+            # Todas as contagens j de uma vez: dp[f, j, c] vs dp[f, j-1, c-wk] + vk, com os candidatos
+            # lidos antes de escrever (o do capitão sai de dp[0] antes de dp[0] ser atualizado)
+            if pode_capitao: np.add(dp[0, :q, :n], vk * capitao_mult, out=cand_cap[:, :n])
+            for f in range(F):
+                np.add(dp[f, :q, :n], vk, out=cand[:, :n])
+                alvo = dp[f, 1:, wk:]
+                escolhas[k, f, 1:, wk:] = cand[:, :n] > alvo
+                np.maximum(alvo, cand[:, :n], out=alvo)
+            if pode_capitao:
+                alvo = dp[1, 1:, wk:]
+                np.copyto(escolhas[k, 1, 1:, wk:], 2, where=cand_cap[:, :n] > alvo)
+                np.maximum(alvo, cand_cap[:, :n], out=alvo)
+        etapas.append((q, linhas, w, escolhas))
+        base = dp[:, q]
+
+    f_final = F - 1
+    if not np.isfinite(base[f_final, C]): return pool.iloc[0:0].assign(capitao=False)
+
+    # Reconstrução: volta posição a posição, jogador a jogador
+    escolhidos, capitao, f, c = [], None, f_final, C
+    for q, linhas, w, escolhas in reversed(etapas):
+        j = q
+        for k in range(len(linhas) - 1, -1, -1):
+            if j == 0: break
+            e = escolhas[k, f, j, c]
+            if e:
+                escolhidos.append(linhas[k])
+                if e == 2: capitao, f = linhas[k], 0
+                j -= 1
+                c -= w[k]
+    time = pool.iloc[escolhidos].copy()
+    time['capitao'] = False
+    if capitao is not None: time.loc[time.index[escolhidos.index(capitao)], 'capitao'] = True
+    return time
+
+
+def pontuacao_escalacao(time, capitao_mult=None, col_pontos='pontuacao_total_periodo'):
+    pts = time[col_pontos].sum()
+    if capitao_mult and time['capitao'].any(): pts += (capitao_mult - 1) * time.loc[time['capitao'], col_pontos].sum()
+    return float(pts)
+
+
+def otimizar_lote(pool, orcamentos, esquemas=None, incluir_tecnico=False, capitao_mult=None, **kwargs):
+    """Resolve todos os pares (esquema, orçamento); uma linha por solução, com os ids escolhidos."""
+    col_pontos = kwargs.get('col_pontos', 'pontuacao_total_periodo')
+    col_preco = kwargs.get('col_preco', 'atletas.preco_num')
+    linhas = []
+    for esq in (esquemas or list(ESQUEMAS)):
+        for orc in orcamentos:
+            t = otimizar_escalacao(pool, esq, orc, incluir_tecnico, capitao_mult, **kwargs)
+            linhas.append({
+                'esquema': esq, 'orcamento': orc, 'viavel': not t.empty,
+                # Preços são float32 no schema compacto: arredonda para não expor ruído (79.949997)
+                'custo': round(float(t[col_preco].astype(float).sum()), 2) if not t.empty else np.nan,
+                'pontos': round(pontuacao_escalacao(t, capitao_mult, col_pontos), 2) if not t.empty else np.nan,
+                'atletas': t['atletas.atleta_id'].tolist() if 'atletas.atleta_id' in t else t.index.tolist(),
+            })
+    return pd.DataFrame(linhas)
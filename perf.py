@@ -0,0 +1,80 @@
+"""Instrumentação opcional das etapas de cada rerun do dashboard.
+
+`Medidor.etapa(nome)` cronometra um bloco e registra linhas processadas e a
+variação de memória residente do processo. Desligado, `etapa` devolve sempre
+o mesmo contexto vazio, e o custo é o de um `with`. Ativa com `?perf=1` na URL
+ou `CARTOLA_PERF=1`; `CARTOLA_PERF_LOG=<arquivo.jsonl>` anexa cada rerun ao log.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class _Etapa:
+    __slots__ = ('linhas',)
+
+    def __init__(self):
+        self.linhas = None
+
+
+_NULA = nullcontext(_Etapa())
+
+
+def memoria_mb():
+    """Memória residente atual do processo (Linux); fora dele, o pico (ru_maxrss)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return float('nan')
+
+
+class Medidor:
+    def __init__(self, ativo=False, caminho_log=None):
+        self.ativo = ativo
+        self.caminho_log = caminho_log
+        self.registros = []
+        self._inicio = time.perf_counter()
+
+    def etapa(self, nome, linhas=None):
+        """`with medidor.etapa('agrupar') as e: ...; e.linhas = len(df)`."""
+        if not self.ativo: return _NULA
+        return self._medir(nome, linhas)
+
+    @contextmanager
+    def _medir(self, nome, linhas):
+        e = _Etapa()
+        e.linhas = linhas
+        mem0, t0 = memoria_mb(), time.perf_counter()
+        try:
+            yield e
+        finally:
+            self.registros.append({'etapa': nome, 'ms': (time.perf_counter() - t0) * 1e3,
+                                   'linhas': e.linhas, 'delta_mb': memoria_mb() - mem0})
+
+    def total_ms(self):
+        return (time.perf_counter() - self._inicio) * 1e3
+
+    def salvar(self, **extra):
+        """Anexa o rerun (etapas + total) ao log JSONL, se configurado."""
+        if not self.ativo or not self.caminho_log: return
+        linha = json.dumps({'ts': time.time(), 'total_ms': self.total_ms(), 'etapas': self.registros, **extra},
+                           ensure_ascii=False, default=str)
+        with _LOCK_LOG, open(self.caminho_log, 'a', encoding='utf-8') as f:
+            f.write(linha + "\n")
+
+
+_LOCK_LOG = threading.Lock()
+
+
+def medidor_da_sessao(query_params=None):
+    """Medidor novo por rerun, ligado por query param (`?perf=1`) ou variável de ambiente."""
+    ativo = os.environ.get('CARTOLA_PERF') == '1' or (query_params is not None and query_params.get('perf') == '1')
+    return Medidor(ativo, os.environ.get('CARTOLA_PERF_LOG'))
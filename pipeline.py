@@ -0,0 +1,133 @@
+"""Preparação da temporada em estágios: bruto -> tipado -> enriquecido -> derivado.
+
+Cada estágio é uma função pura (não altera a entrada, que pode estar num cache
+compartilhado) e pode ser cacheada por versão dos dados. O resultado final é
+uma `Temporada` imutável, feita para ficar uma única vez na memória do
+processo; índices, motor de filtros, busca e confrontos são montados sob demanda, na
+primeira vez em que alguma aba precisa deles.
+"""
+from functools import cached_property
+
+import pandas as pd
+
+from armazenamento import POSSIVEIS_NOMES_CLUBE, carregar_temporada
+from busca import indice_atletas
+from clubes import TabelaClubes, forca_confrontos
+from esquema import compactar_temporada
+from filtros import MotorFiltros
+from indice_rodadas import IndiceRodadas
+
+POS_MAP = {1: 'Goleiro', 2: 'Lateral', 3: 'Zagueiro', 4: 'Meia', 5: 'Atacante', 6: 'Técnico'}
+TODOS_SCOUTS = ['G', 'A', 'FT', 'FD', 'FF', 'FS', 'PS', 'I', 'PP', 'DS', 'SG', 'DE', 'DP', 'GS', 'FC', 'PC', 'CA', 'CV', 'GC']
+COLS_TOTAIS = ['scouts_ofensivos_total', 'scouts_defensivos_total', 'finalizacoes_total']
+
+
+def estagio_bruto(dir_dados="."):
+    df, df_jogos, _ = carregar_temporada(dir_dados)
+    return df, df_jogos
+
+
+def estagio_tipado(df, df_jogos):
+    """Coluna de clube detectada dinamicamente + ids numéricos. Devolve (df, df_jogos, col_clube)."""
+    if df.empty: return df, df_jogos, None
+    df, df_jogos = df.copy(), df_jogos.copy()
+    col_clube = next((c for c in POSSIVEIS_NOMES_CLUBE if c in df.columns), None)
+    if not col_clube:
+        # Se não achar, cria uma genérica baseada no ID
+        df['Nome_Clube_Gen'] = "Clube " + df['atletas.clube_id'].astype(str)
+        col_clube = 'Nome_Clube_Gen'
+
+    df['atletas.rodada_id'] = pd.to_numeric(df['atletas.rodada_id'], errors='coerce').fillna(0).astype(int)
+    df['atletas.clube_id'] = pd.to_numeric(df['atletas.clube_id'], errors='coerce').fillna(0).astype(int)
+    if not df_jogos.empty:
+        df_jogos['rodada_id'] = pd.to_numeric(df_jogos['rodada_id'], errors='coerce').fillna(0).astype(int)
+        df_jogos['clube_id'] = pd.to_numeric(df_jogos['clube_id'], errors='coerce').fillna(0).astype(int)
+    return df, df_jogos, col_clube
+
+
+def estagio_enriquecido(df, df_jogos):
+    """Merge com os confrontos (mando/adversário/local), deduplicação e nome da posição."""
+    if df.empty: return df
+    if not df_jogos.empty:
+        cols_jogo = ['rodada_id', 'clube_id'] + [c for c in ['Mando_Padrao', 'Adversario', 'Estadio', 'Data', 'Hora'] if c in df_jogos.columns]
+        df = pd.merge(df, df_jogos[cols_jogo], left_on=['atletas.rodada_id', 'atletas.clube_id'], right_on=['rodada_id', 'clube_id'], how='left')
+    else: df = df.copy()
+
+    for c in ['Mando_Padrao', 'Adversario']:
+        if c not in df.columns: df[c] = 'N/A'
+        df[c] = df[c].fillna('N/A')
+
+    df = df.drop_duplicates(subset=['atletas.atleta_id', 'atletas.rodada_id'])
+    df['posicao_nome'] = df['atletas.posicao_id'].map(POS_MAP)
+    return df
+
+
+def estagio_derivado(df, col_clube):
+    """Scouts completos, totais auxiliares e schema compacto. Devolve (fato, dim_atletas)."""
+    df = df.copy()
+    for col in TODOS_SCOUTS:
+        if col not in df.columns: df[col] = 0
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    df['tamanho_visual'] = df['atletas.pontos_num'].clip(lower=1.0).fillna(1.0)
+    df['scouts_ofensivos_total'] = df['G'] + df['A'] + df['FD'] + df['FF'] + df['FT'] + df['FS']
+    df['scouts_defensivos_total'] = df['DS'] + df['DE'] + df['SG']
+    df['finalizacoes_total'] = df['FD'] + df['FF'] + df['FT']
+    return compactar_temporada(df, col_clube, TODOS_SCOUTS + COLS_TOTAIS)
+
+
+class Temporada:
+    """Temporada processada, somente leitura e compartilhável entre sessões."""
+
+    def __init__(self, df, df_jogos, dim_atletas, col_clube, versao=None):
+        self.df, self.df_jogos, self.dim_atletas = df, df_jogos, dim_atletas
+        self.col_clube, self.versao = col_clube, versao
+
+    @property
+    def vazia(self):
+        return self.df.empty
+
+    @property
+    def cols_ultimo(self):
+        return ['atletas.preco_num', 'atletas.apelido', self.col_clube, 'atletas.clube_id', 'posicao_nome',
+                'finalizacoes_total', 'atletas.jogos_num'] + TODOS_SCOUTS
+
+    @cached_property
+    def indice(self):
+        return IndiceRodadas(self.df, self.cols_ultimo)
+
+    @cached_property
+    def motor_filtros(self):
+        return MotorFiltros(self.df, self.col_clube)
+
+    @cached_property
+    def clubes(self):
+        return TabelaClubes(self.df, self.df_jogos, self.col_clube)
+
+    @cached_property
+    def busca(self):
+        return indice_atletas(self.df, self.dim_atletas)
+
+    @cached_property
+    def confrontos(self):
+        """Força dos confrontos de todas as rodadas (ver `clubes.forca_confrontos`)."""
+        return forca_confrontos(self.df, self.df_jogos, self.clubes)
+
+    def mascaras(self, filtros):
+        """`filtros` = (rodada_range, preco_range, clubes, posicoes, mandos) -> (mascara_base, mascara_completo)."""
+        return self.motor_filtros.mascaras(*filtros)
+
+    def agrupar(self, rodada_range, mascara):
+        return self.indice.agregar(rodada_range[0], rodada_range[1], mascara)
+
+
+def montar_temporada(df_enriquecido, df_jogos, col_clube, versao=None):
+    if df_enriquecido.empty: return Temporada(df_enriquecido, df_jogos, pd.DataFrame(), col_clube, versao)
+    fato, dim = estagio_derivado(df_enriquecido, col_clube)
+    return Temporada(fato, df_jogos, dim, col_clube, versao)
+
+
+def preparar_temporada(dir_dados=".", versao=None):
+    """Todos os estágios em sequência, sem cache (uso headless)."""
+    df, df_jogos, col_clube = estagio_tipado(*estagio_bruto(dir_dados))
+    return montar_temporada(estagio_enriquecido(df, df_jogos), df_jogos, col_clube, versao)
@@ -0,0 +1,128 @@
+"""Projeção Monte Carlo da pontuação na rodada, vetorizada sobre o mercado inteiro.
+
+Cada atleta recebe uma normal cuja média é a dele nas rodadas em que entrou em
+campo, encolhida para a média da posição (`FORCA_PRIOR` jogos fictícios),
+mais o quanto o adversário da rodada cede àquela posição acima da média da
+liga e o efeito casa/fora da posição, os dois também encolhidos pelo número de
+jogos que os sustentam. A variância segue o mesmo encolhimento, somada à
+incerteza da própria média. As rodadas são sorteadas em blocos de uma matriz
+(simulações x atletas), sem laço por jogador; P(top-k) sai da contagem de
+quantas vezes cada atleta ficou entre os k maiores.
+
+    python -m projecao <dir_dados> <rodada> [--simulacoes 5000] [--top-k 5]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+FORCA_PRIOR = 5.0
+FORCA_CONTEXTO = 10.0
+N_SIMULACOES = 5_000
+TOP_K = 5
+BLOCO_SIMULACOES = 1_000
+DESVIO_MINIMO = 0.5
+
+COL_PONTOS = 'atletas.pontos_num'
+
+
+def historico_jogado(df):
+    """Linhas em que o atleta entrou em campo (sem a coluna, pontuação diferente de zero)."""
+    if 'atletas.entrou_em_campo' in df.columns: return df[df['atletas.entrou_em_campo'].fillna(False).astype(bool)]
+    return df[df[COL_PONTOS].fillna(0) != 0]
+
+
+def _encolher(valor, n, prior, forca):
+    return (n * valor + forca * prior) / (n + forca)
+
+
+def _efeito(hist, chaves, media_pos):
+    """Média de pontos por `chaves` (que incluem a posição) menos a média da posição, encolhida."""
+    g = hist.groupby(chaves, observed=True)[COL_PONTOS].agg(['mean', 'size']).reset_index()
+    g['efeito'] = _encolher(g['mean'] - g['posicao_nome'].map(media_pos).astype(float), g['size'], 0.0, FORCA_CONTEXTO)
+    return g[chaves + ['efeito']]
+
+
+def parametros_rodada(df_pool, df_hist, df_jogos, rodada, excluir_tecnico=True):
+    """Média e desvio projetados de cada atleta do pool cujo clube joga na `rodada`."""
+    jogos = df_jogos.loc[df_jogos['rodada_id'] == rodada, ['clube_id', 'Adversario', 'Mando_Padrao']]
+    base = pd.merge(df_pool, jogos, left_on='atletas.clube_id', right_on='clube_id', how='inner')
+    # Técnico não pode ser capitão
+    if excluir_tecnico: base = base[base['posicao_nome'] != 'Técnico']
+    hist = historico_jogado(df_hist)
+    if base.empty or hist.empty: return pd.DataFrame()
+
+    pos = hist.groupby('posicao_nome', observed=True)[COL_PONTOS].agg(['mean', 'var'])
+    media_pos, var_pos = pos['mean'], pos['var'].fillna(pos['var'].mean())
+    atl = hist.groupby('atletas.atleta_id')[COL_PONTOS].agg(n='size', media='mean', var='var')
+    base = base.join(atl, on='atletas.atleta_id')
+
+    n = base['n'].fillna(0).to_numpy(float)
+    mu_pos = base['posicao_nome'].map(media_pos).astype(float).fillna(float(hist[COL_PONTOS].mean())).to_numpy()
+    v_pos = base['posicao_nome'].map(var_pos).astype(float).fillna(float(hist[COL_PONTOS].var())).to_numpy()
+    media = _encolher(base['media'].fillna(0).to_numpy(float), n, mu_pos, FORCA_PRIOR)
+    var = _encolher(base['var'].fillna(0).to_numpy(float), np.maximum(n - 1, 0), v_pos, FORCA_PRIOR)
+
+    contexto = hist[hist['Adversario'] != 'N/A']
+    adv = _efeito(contexto, ['Adversario', 'posicao_nome'], media_pos)
+    mando = _efeito(contexto, ['Mando_Padrao', 'posicao_nome'], media_pos)
+    base['Ajuste Adv'] = base[['Adversario', 'posicao_nome']].merge(adv, how='left')['efeito'].fillna(0).to_numpy()
+    base['Ajuste Mando'] = base[['Mando_Padrao', 'posicao_nome']].merge(mando, how='left')['efeito'].fillna(0).to_numpy()
+
+    base['Jogos'] = n.astype(int)
+    base['Média'] = media
+    base['Esperado'] = media + base['Ajuste Adv'] + base['Ajuste Mando']
+    base['Desvio'] = np.maximum(np.sqrt(var * (1 + 1 / (n + FORCA_PRIOR))), DESVIO_MINIMO)
+    return base.reset_index(drop=True)
+
+
+def simular_top_k(media, desvio, n_simulacoes=N_SIMULACOES, top_k=TOP_K, semente=None):
+    """Frequência com que cada atleta é o maior e fica entre os `top_k` maiores. Devolve (p_top1, p_topk)."""
+    media, desvio = np.asarray(media, np.float32), np.asarray(desvio, np.float32)
+    n = len(media)
+    top_k = min(top_k, n)
+    if n == 0: return np.zeros(0), np.zeros(0)
+    rng = np.random.default_rng(semente)
+    cont_top1, cont_topk = np.zeros(n, np.int64), np.zeros(n, np.int64)
+    for inicio in range(0, n_simulacoes, BLOCO_SIMULACOES):
+        b = min(BLOCO_SIMULACOES, n_simulacoes - inicio)
+        x = rng.standard_normal((b, n), dtype=np.float32)
+        x *= desvio
+        x += media
+        cont_top1 += np.bincount(x.argmax(axis=1), minlength=n)
+        cont_topk += np.bincount(np.argpartition(x, n - top_k, axis=1)[:, n - top_k:].ravel(), minlength=n)
+    return cont_top1 / n_simulacoes, cont_topk / n_simulacoes
+
+
+def projetar_capitaes(df_pool, df_hist, df_jogos, rodada, n_simulacoes=N_SIMULACOES, top_k=TOP_K, semente=0):
+    """Ranking de capitão por pontuação esperada, com desvio e P(top 1)/P(top k) simulados."""
+    base = parametros_rodada(df_pool, df_hist, df_jogos, rodada)
+    if base.empty: return pd.DataFrame()
+    base['P(Top 1)'], base[f'P(Top {top_k})'] = simular_top_k(base['Esperado'], base['Desvio'], n_simulacoes, top_k, semente)
+    cols = ['atletas.apelido', 'posicao_nome', 'Adversario', 'Mando_Padrao', 'Jogos', 'Média', 'Ajuste Adv',
+            'Ajuste Mando', 'Esperado', 'Desvio', 'P(Top 1)', f'P(Top {top_k})']
+    return base[cols].sort_values('Esperado', ascending=False).round(3)
+
+
+def main(argv=None):
+    from pipeline import preparar_temporada
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('dir_dados')
+    ap.add_argument('rodada', type=int)
+    ap.add_argument('--simulacoes', type=int, default=N_SIMULACOES)
+    ap.add_argument('--top-k', type=int, default=TOP_K)
+    ap.add_argument('--linhas', type=int, default=20)
+    args = ap.parse_args(argv)
+
+    t = preparar_temporada(args.dir_dados)
+    hist = t.df[t.df['atletas.rodada_id'] < args.rodada]
+    pool = t.agrupar((int(hist['atletas.rodada_id'].min()), args.rodada - 1), None) if not hist.empty else pd.DataFrame()
+    if pool.empty:
+        print("Sem histórico antes da rodada", args.rodada)
+        return
+    print(projetar_capitaes(pool, hist, t.df_jogos, args.rodada, args.simulacoes, args.top_k).head(args.linhas).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Relatório em lote: todos os artefatos do dashboard, sem Streamlit.
+
+Para cada rodada `r` do intervalo pedido grava, em `<saida>/rodada-<r>/`:
+
+- `jogos`: confrontos da rodada com a força de cada lado;
+- `raio_x`, `clubes`, `mercado`: Raio-X, médias por clube e mercado agrupado
+  (com `pontuacao_basica_atual`) no acumulado `[inicio, r]`, como o dashboard
+  mostra com o slider de rodadas nessa posição (`inicio` = primeira rodada
+  pontuada da temporada; o intervalo pedido só escolhe quais `r` gravar);
+- `capitao`: projeção Monte Carlo da rodada `r`, só com o histórico anterior a ela;
+- `escalacoes`: escalação ótima de cada esquema com o mercado de `[inicio, r]`.
+
+Rodadas que já têm confrontos mas ainda não têm pontuação (a próxima rodada)
+também entram: saem só `jogos`, `capitao` e `escalacoes`, as duas últimas com
+o que veio antes de `r`.
+
+As rodadas são processadas em paralelo (um processo por núcleo, cada um com a
+sua `Temporada` carregada do store), e cada uma é gravada assim que termina.
+`<saida>/manifest.json` lista o que foi gerado.
+
+    python -m relatorio <dir_dados> [--rodadas 1 38] [--saida relatorios] [--formato parquet|json]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from analises import media_por_clube, raio_x
+from otimizador import ESQUEMAS, MULT_CAPITAO, otimizar_escalacao
+from pipeline import TODOS_SCOUTS, preparar_temporada
+from projecao import projetar_capitaes
+
+ORCAMENTO_PADRAO = 100.0
+FORMATOS = ('parquet', 'json')
+
+_temporada = None
+
+
+def _iniciar_processo(dir_dados):
+    global _temporada
+    _temporada = preparar_temporada(dir_dados)
+
+
+def artefatos_rodada(temporada, inicio, rodada, orcamento=ORCAMENTO_PADRAO):
+    """Dicionário nome -> DataFrame com tudo que o dashboard mostra para a rodada `rodada`."""
+    df, col_clube = temporada.df, temporada.col_clube
+    rodadas = df['atletas.rodada_id']
+    confrontos = temporada.confrontos
+    saida = {'jogos': confrontos[confrontos['rodada_id'] == rodada].reset_index(drop=True)}
+
+    anterior = df[(rodadas >= inicio) & (rodadas < rodada)]
+    pool_anterior = temporada.agrupar((inicio, rodada - 1), None) if not anterior.empty else None
+    if pool_anterior is not None:
+        saida['capitao'] = projetar_capitaes(pool_anterior, anterior, temporada.df_jogos, rodada).reset_index(drop=True)
+
+    if (rodadas == rodada).any():
+        periodo = df[(rodadas >= inicio) & (rodadas <= rodada)]
+        mercado = temporada.agrupar((inicio, rodada), None)
+        p = raio_x(periodo)
+        p.columns = p.columns.astype(str)
+        saida['raio_x'] = p.reset_index()
+        saida['clubes'] = media_por_clube(periodo, col_clube).reset_index(drop=True)
+        cols = ['atletas.atleta_id', 'atletas.apelido', col_clube, 'posicao_nome', 'atletas.preco_num',
+                'pontuacao_total_periodo', 'pontuacao_basica_atual'] + TODOS_SCOUTS
+        saida['mercado'] = mercado[cols].sort_values('pontuacao_total_periodo', ascending=False).reset_index(drop=True)
+    else:
+        # Rodada ainda sem pontuação: escala com o mercado até a anterior
+        mercado = pool_anterior
+    if mercado is None: return saida
+
+    times = []
+    for esquema in ESQUEMAS:
+        t = otimizar_escalacao(mercado, esquema, orcamento, incluir_tecnico=True, capitao_mult=MULT_CAPITAO)
+        if not t.empty: times.append(t[['atletas.atleta_id', 'atletas.apelido', 'posicao_nome', 'atletas.preco_num',
+                                        'pontuacao_total_periodo', 'capitao']].assign(esquema=esquema))
+    if times: saida['escalacoes'] = pd.concat(times, ignore_index=True)
+    return saida
+
+
+def gravar(tabela, caminho_base, formato):
+    """Grava um artefato; categorias viram texto para o arquivo não depender do schema em memória."""
+    tabela = tabela.copy()
+    for c in tabela.columns:
+        if isinstance(tabela[c].dtype, pd.CategoricalDtype): tabela[c] = tabela[c].astype(str)
+    caminho = f"{caminho_base}.{formato}"
+    if formato == 'parquet': tabela.to_parquet(caminho, index=False)
+    else: tabela.to_json(caminho, orient='records', force_ascii=False, indent=1)
+    return caminho
+
+
+def _processar_rodada(inicio, rodada, orcamento, dir_saida, formato):
+    t0 = time.perf_counter()
+    destino = os.path.join(dir_saida, f"rodada-{rodada}")
+    os.makedirs(destino, exist_ok=True)
+    arquivos = {}
+    for nome, tabela in artefatos_rodada(_temporada, inicio, rodada, orcamento).items():
+        arquivos[nome] = os.path.relpath(gravar(tabela, os.path.join(destino, nome), formato), dir_saida)
+    return rodada, arquivos, time.perf_counter() - t0
+
+
+def gerar_relatorio(dir_dados, dir_saida, rodadas=None, formato='parquet', orcamento=ORCAMENTO_PADRAO, processos=None):
+    """Processa as rodadas em paralelo e devolve o manifesto gravado em `<dir_saida>/manifest.json`."""
+    if formato not in FORMATOS: raise ValueError(f"formato deve ser um de {FORMATOS}")
+    # Sincroniza o store uma vez aqui; os processos só leem o que já está pronto
+    temporada = preparar_temporada(dir_dados)
+    if temporada.vazia: raise ValueError(f"Nenhuma rodada encontrada em {dir_dados}")
+    # Rodadas pontuadas + rodadas só com confrontos (a próxima, ainda sem pontuação)
+    disponiveis = sorted({int(r) for r in temporada.indice.rodadas} |
+                         {int(r) for r in temporada.df_jogos.get('rodada_id', pd.Series(dtype=int)).unique()})
+    primeira, fim = rodadas or (disponiveis[0], disponiveis[-1])
+    alvo = [r for r in disponiveis if primeira <= r <= fim]
+    if not alvo: raise ValueError(f"Nenhuma rodada com pontuação ou confrontos entre {primeira} e {fim}")
+    inicio = int(temporada.indice.rodadas[0])
+    os.makedirs(dir_saida, exist_ok=True)
+
+    manifesto = {'dir_dados': os.path.abspath(dir_dados), 'rodadas': [primeira, fim], 'inicio_acumulado': inicio,
+                 'formato': formato, 'orcamento': orcamento, 'arquivos': {}}
+    with ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(dir_dados,)) as ex:
+        futuros = [ex.submit(_processar_rodada, inicio, r, orcamento, dir_saida, formato) for r in alvo]
+        for f in as_completed(futuros):
+            rodada, arquivos, segundos = f.result()
+            manifesto['arquivos'][str(rodada)] = arquivos
+            print(f"rodada {rodada}: {len(arquivos)} artefatos em {segundos:.2f}s")
+    manifesto['arquivos'] = dict(sorted(manifesto['arquivos'].items(), key=lambda kv: int(kv[0])))
+    with open(os.path.join(dir_saida, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=1, ensure_ascii=False)
+    return manifesto
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('dir_dados')
+    ap.add_argument('--rodadas', type=int, nargs=2, metavar=('INICIO', 'FIM'))
+    ap.add_argument('--saida', default='relatorios')
+    ap.add_argument('--formato', choices=FORMATOS, default='parquet')
+    ap.add_argument('--orcamento', type=float, default=ORCAMENTO_PADRAO)
+    ap.add_argument('--processos', type=int, help="padrão: um por núcleo")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        m = gerar_relatorio(args.dir_dados, args.saida, args.rodadas, args.formato, args.orcamento, args.processos)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"{len(m['arquivos'])} rodadas em {time.perf_counter() - t0:.1f}s -> {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
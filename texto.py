@@ -0,0 +1,12 @@
+"""Normalização de texto compartilhada pelas buscas de clubes e atletas."""
+import re
+import unicodedata
+
+import pandas as pd
+
+
+def normalizar_texto(valor):
+    """Minúsculas, sem acentos, só letras/dígitos, palavras separadas por um espaço ("Atlético-MG" -> "atletico mg")."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)): return ''
+    s = unicodedata.normalize('NFKD', str(valor)).encode('ascii', 'ignore').decode().lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', s))